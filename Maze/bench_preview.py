@@ -0,0 +1,49 @@
+import os
+import time
+import tracemalloc
+import cv2
+import numpy as np
+import pygame
+from preview import CameraPreview
+
+FRAMES = 500
+FRAME_SIZE = (480, 640, 3)
+
+
+def legacy_preview(frame):
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame = cv2.resize(frame, (160, 120))
+    frame = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
+    return frame
+
+
+def run(name, convert, frames, target):
+    for frame in frames[:10]:
+        target.blit(convert(frame), (0, 0))
+
+    start = time.perf_counter()
+    for frame in frames:
+        target.blit(convert(frame), (0, 0))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for frame in frames:
+        target.blit(convert(frame), (0, 0))
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    print(f"{name:8} {elapsed / len(frames) * 1e6:8.1f} us/frame  "
+          f"peak allocation over {len(frames)} frames {peak:8d} B")
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    target = pygame.display.set_mode((160, 120))
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, FRAME_SIZE, dtype=np.uint8) for _ in range(8)] * (FRAMES // 8)
+
+    run("legacy", legacy_preview, frames, target)
+    run("preview", CameraPreview().update, frames, target)
+    pygame.quit()
@@ -1,12 +1,18 @@
 import pygame
 import os
-import cv2
-import mediapipe as mp
 import threading
+import numpy as np
+from hand_tracker import HandTracker, mp_hands
+from joystick import FingerJoystick
+from preview import CameraPreview
+from solver import DistanceField
+from maze_io import load_mazes
+from viewport import ChunkCache, Viewport
 
 
 pygame.init()
 TILE_SIZE = 80
+# Visible tiles; larger mazes scroll with the player.
 GRID_WIDTH = 6
 GRID_HEIGHT = 7
 WIDTH = GRID_WIDTH * TILE_SIZE
@@ -27,12 +33,21 @@ COLORS = {
     "start": BLUE,
     "goal": GREEN,
     "player": RED,
+    "hint": (255, 200, 0),
     "bg": (0, 0, 0),
 }
 
+TILE_COLORS = {
+    0: COLORS["wall"],
+    1: COLORS["path"],
+    2: COLORS["start"],
+    3: COLORS["goal"],
+}
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSETS_DIR = BASE_DIR + "/assets/"
 MAZE_FILE = os.path.join(BASE_DIR, "mazes.txt")
+MAZE_PACK = os.path.join(BASE_DIR, "mazes.pack")
 
 done_sound = pygame.mixer.Sound( ASSETS_DIR + "done.wav")
 error_sound = pygame.mixer.Sound( ASSETS_DIR + "error.wav")
@@ -45,8 +60,6 @@ exit_img = pygame.transform.scale(exit_img, (50, 50))
 help_img = pygame.transform.scale(help_img, (70, 60))
 
 hand_x, hand_y = 0, 0
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
 hands = mp_hands.Hands(
     static_image_mode=False,       
     max_num_hands=1,                
@@ -54,48 +67,35 @@ hands = mp_hands.Hands(
     min_tracking_confidence=0.5     
 )
 
-def load_mazes_from_file(filename):
-    mazes = []
-    current_maze = []
-    with open(filename, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line == "":
-                continue
-            if line.startswith("#"):
-                if current_maze:
-                    mazes.append(current_maze)
-                    current_maze = []
-                continue
-            row = list(map(int, line.split()))
-            current_maze.append(row)
-        if current_maze:
-            mazes.append(current_maze)
-    return mazes
-
-
-def draw_maze(maze):
-    for y, row in enumerate(maze):
-        for x, tile in enumerate(row):
-            rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-            if tile == 0:
-                pygame.draw.rect(screen, BLACK, rect)
-            elif tile == 1:
-                pygame.draw.rect(screen, WHITE, rect)
-            elif tile == 2:
-                pygame.draw.rect(screen, BLUE, rect)
-            elif tile == 3:
-                pygame.draw.rect(screen, GREEN, rect)
+def load_view(maze, x, y):
+    cache = ChunkCache(maze, TILE_SIZE, TILE_COLORS, COLORS["bg"])
+    viewport = Viewport(WIDTH, HEIGHT, TILE_SIZE, len(maze[0]), len(maze))
+    viewport.center_on(x, y)
+    return cache, viewport
+
+def draw_maze(cache, viewport, rect=None):
+    viewport.draw(screen, cache, COLORS["bg"], rect)
 
 def find_start(maze):
-    for y, row in enumerate(maze):
-        for x, tile in enumerate(row):
-            if tile == 2:
-                return x, y
+    starts = np.argwhere(np.asarray(maze) == 2)
+    return int(starts[0][1]), int(starts[0][0])
+
+def draw_player(rect):
+    pygame.draw.circle(screen, COLORS["player"], rect.center, TILE_SIZE // 3)
 
-def draw_player(x, y):
-    center = (x * TILE_SIZE + TILE_SIZE // 2, y * TILE_SIZE + TILE_SIZE // 2)
-    pygame.draw.circle(screen, COLORS["player"], center, TILE_SIZE // 3)
+def draw_hint(rect):
+    pygame.draw.circle(screen, COLORS["hint"], rect.center, TILE_SIZE // 6)
+
+def load_distance_field(maze, index, fields):
+    # Runs on a worker thread; the hint appears once the field is in `fields`.
+    field = DistanceField(maze)
+    if not field.reachable:
+        print(f"Maze {index + 1}: goal is unreachable from the start")
+    fields[index] = field
+
+def start_distance_field(maze, index, fields):
+    fields.clear()
+    threading.Thread(target=load_distance_field, args=(maze, index, fields), daemon=True).start()
 
 def handle_input(keys):
     dx = dy = 0
@@ -123,27 +123,6 @@ def show_game_over():
     pygame.display.update()
     pygame.time.wait(3000)
 
-def get_hand_frame(cap, hands):
-    ret, frame = cap.read()
-    if not ret:
-        return None
-    
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
-
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-    
-    return frame
-
-def cvframe_to_pygame(frame):
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  
-    frame = cv2.resize(frame, (160, 120))  
-    frame = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
-    return frame
-
 def draw_icons(img,pos):
 
     screen.blit(img,pos)
@@ -152,6 +131,15 @@ def draw_icons(img,pos):
 
     return img_rect
 
+def draw_camera_off(camera_pos):
+    start_pos1 = camera_pos
+    end_pos1 = (camera_pos[0] + 50, camera_pos[1] + 50)
+    start_pos2 = (camera_pos[0], camera_pos[1] + 50)
+    end_pos2 = (camera_pos[0] + 50, camera_pos[1])
+
+    pygame.draw.line(screen, (255, 0, 0), start_pos1, end_pos1, 4)
+    pygame.draw.line(screen, (255, 0, 0), start_pos2, end_pos2, 4)
+
 def draw_help():
     screen.fill((240, 240, 240))
 
@@ -171,6 +159,8 @@ def draw_help():
         "",
         "When the camera is OFF:",
         "Use the keyboard arrow keys to move the player manually.",
+        "",
+        "Press H to show or hide a hint for the next step.",
     ]
 
     y = 120
@@ -187,67 +177,73 @@ def draw_help():
 
 
 def main():
-    mazes = load_mazes_from_file(MAZE_FILE)
+    mazes = load_mazes(MAZE_PACK if os.path.exists(MAZE_PACK) else MAZE_FILE)
     maze_index = 0
     maze = mazes[maze_index]
+    fields = {}
+    start_distance_field(maze, maze_index, fields)
     start_x, start_y = find_start(maze)
     player_x, player_y = start_x, start_y
+    maze_cache, viewport = load_view(maze, player_x, player_y)
 
     clock = pygame.time.Clock()
 
-    cap = None
+    tracker = None
 
     camera_on = False
     camera_pos = (10, HEIGHT - 130)
     exit_pos = (70, HEIGHT - 130)
     help_pos = (120,HEIGHT - 130)
+    preview_pos = (WIDTH - 160, HEIGHT - 120)
+
+    cam_rect = pygame.Rect(camera_pos, (50, 50))
+    exit_rect = pygame.Rect(exit_pos, (50, 50))
+    help_rect = pygame.Rect(help_pos, (50, 50))
+    hud_rect = pygame.Rect(camera_pos, (help_pos[0] + help_img.get_width() - camera_pos[0], 60))
+    preview_rect = pygame.Rect(preview_pos, (160, 120))
+    preview = CameraPreview(preview_rect.size)
 
     help_on = False
+    hint_on = False
+    full_redraw = True
+    drawn_pos = (player_x, player_y)
+    drawn_hint = None
 
     running = True
 
     while running:
-        screen.fill(COLORS["bg"])
-        draw_maze(maze)
-        draw_player(player_x, player_y)
-
-        cam_rect = draw_icons(camera_img,camera_pos)
-        exit_rect = draw_icons(exit_img,exit_pos)
-        help_rect = draw_icons(help_img,help_pos)
-
-        if not camera_on:
-            start_pos1 = camera_pos
-            end_pos1 = (camera_pos[0] + 50, camera_pos[1] + 50)
-            start_pos2 = (camera_pos[0], camera_pos[1] + 50)
-            end_pos2 = (camera_pos[0] + 50, camera_pos[1])
-
-            pygame.draw.line(screen, (255, 0, 0), start_pos1, end_pos1, 4)
-            pygame.draw.line(screen, (255, 0, 0), start_pos2, end_pos2, 4)
-
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
+                if event.key == pygame.K_SPACE and help_on:
                     help_on = False
+                    full_redraw = True
+                elif event.key == pygame.K_h:
+                    hint_on = not hint_on
+                    full_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mx, my = pygame.mouse.get_pos()
                 if cam_rect.collidepoint(mx, my):
-                    if cap is not None:
-                        cap.release()
-                        cap = None
+                    if tracker is not None:
+                        tracker.stop()
+                        print("Camera stats:", tracker.stats())
+                        tracker = None
                         camera_on = False
                     else:
-                        cap = cv2.VideoCapture(0)
+                        tracker = HandTracker(FingerJoystick(hands))
+                        tracker.start()
                         camera_on = True
+                    full_redraw = True
                 elif exit_rect.collidepoint(mx, my):
                     running = False
-                elif help_rect.collidepoint(mx, my):
+                elif help_rect.collidepoint(mx, my) and not help_on:
                     help_on = True
-        if help_on:
-            draw_help()
+                    full_redraw = True
 
-        if not camera_on:
+        if camera_on:
+            dx, dy = tracker.current_direction()
+        else:
             keys = pygame.key.get_pressed()
             dx, dy = handle_input(keys)
 
@@ -266,22 +262,69 @@ def main():
             if result[0] is not None:
                 done_sound.play()
                 maze_index, maze, (player_x, player_y) = result
+                start_distance_field(maze, maze_index, fields)
+                maze_cache, viewport = load_view(maze, player_x, player_y)
                 start_x, start_y = player_x, player_y
+                full_redraw = True
                 pygame.time.delay(500)
             else:
                 show_game_over()
                 print("Bye")
                 running = False
-        if camera_on:        
-            frame = get_hand_frame(cap, hands)
-            if frame is not None:
-                hand_surface = cvframe_to_pygame(frame)
-                screen.blit(hand_surface, (WIDTH - 160, HEIGHT - 120))
+                continue
+
+        if viewport.follow(player_x, player_y):
+            full_redraw = True
+        field = fields.get(maze_index)
+        hint_cell = field.next_cell(player_x, player_y) if hint_on and field is not None else None
 
-        pygame.display.update()
+        if help_on:
+            dirty = []
+            if full_redraw:
+                draw_help()
+                dirty.append(screen.get_rect())
+        elif full_redraw:
+            draw_maze(maze_cache, viewport)
+            dirty = [screen.get_rect()]
+        else:
+            dirty = []
+            if (player_x, player_y) != drawn_pos:
+                dirty.append(viewport.cell_rect(*drawn_pos))
+                dirty.append(viewport.cell_rect(player_x, player_y))
+            if hint_cell != drawn_hint:
+                for cell in (drawn_hint, hint_cell):
+                    if cell is not None:
+                        dirty.append(viewport.cell_rect(*cell))
+            if hud_rect.collidelist(dirty) != -1:
+                dirty.append(hud_rect)
+            for rect in dirty:
+                draw_maze(maze_cache, viewport, rect)
+
+        if dirty and not help_on:
+            if hint_cell is not None:
+                draw_hint(viewport.cell_rect(*hint_cell))
+            draw_player(viewport.cell_rect(player_x, player_y))
+            if full_redraw or hud_rect in dirty:
+                draw_icons(camera_img,camera_pos)
+                draw_icons(exit_img,exit_pos)
+                draw_icons(help_img,help_pos)
+                if not camera_on:
+                    draw_camera_off(camera_pos)
+        drawn_pos = (player_x, player_y)
+        drawn_hint = hint_cell
+        full_redraw = False
+
+        if camera_on:
+            hand_result = tracker.latest()
+            if hand_result is not None:
+                screen.blit(preview.update(hand_result.frame), preview_pos)
+                dirty.append(preview_rect)
+
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(10)
 
-    if cap : cap.release()
+    if tracker : tracker.stop()
     hands.close()
     pygame.quit()
 
@@ -0,0 +1,134 @@
+import threading
+import time
+import cv2
+import mediapipe as mp
+
+
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+
+
+class LatestSlot:
+    # Single-item buffer: a new item replaces an unconsumed one (latest frame wins).
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.cond:
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+            self.cond.notify()
+
+    def take(self, timeout=None):
+        with self.cond:
+            if self.item is None and not self.closed:
+                self.cond.wait(timeout)
+            item, self.item = self.item, None
+            return item
+
+    def poll(self):
+        with self.cond:
+            item, self.item = self.item, None
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class HandResult:
+    def __init__(self, frame_id, captured_at, frame, landmarks):
+        self.frame_id = frame_id
+        self.captured_at = captured_at
+        self.frame = frame
+        self.landmarks = landmarks
+
+
+class HandTracker:
+    def __init__(self, controller, camera_index=0, max_age=0.5):
+        self.controller = controller
+        self.camera_index = camera_index
+        self.max_age = max_age
+        self.frames = LatestSlot()
+        self.results = LatestSlot()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.captured = 0
+        self.processed = 0
+        self.stale = 0
+        self.direction = (0, 0)
+        self.direction_at = 0
+
+    def start(self):
+        self.threads = [
+            threading.Thread(target=self.capture_loop, daemon=True),
+            threading.Thread(target=self.inference_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.frames.close()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.threads = []
+
+    def capture_loop(self):
+        cap = cv2.VideoCapture(self.camera_index)
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    time.sleep(0.01)
+                    continue
+                self.captured += 1
+                self.frames.put((self.captured, time.monotonic(), cv2.flip(frame, 1)))
+        finally:
+            cap.release()
+
+    def inference_loop(self):
+        while not self.stop_event.is_set():
+            item = self.frames.take(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, captured_at, frame = item
+            landmarks, direction = self.controller.process(frame)
+            if landmarks is not None:
+                mp_drawing.draw_landmarks(frame, landmarks, mp_hands.HAND_CONNECTIONS)
+
+            self.direction = direction
+            self.direction_at = captured_at
+            self.processed += 1
+            self.results.put(HandResult(frame_id, captured_at, frame, landmarks))
+
+    def latest(self):
+        result = self.results.poll()
+        if result is None:
+            return None
+        if time.monotonic() - result.captured_at > self.max_age:
+            self.stale += 1
+            return None
+        return result
+
+    def current_direction(self):
+        if time.monotonic() - self.direction_at > self.max_age:
+            return 0, 0
+        return self.direction
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped_frames": self.frames.dropped,
+            "dropped_results": self.results.dropped,
+            "stale": self.stale,
+            "inferences": self.controller.inferences,
+            "skipped": self.controller.skipped_frames,
+            "timings_ms": self.controller.stage_timings(),
+        }
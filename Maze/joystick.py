@@ -0,0 +1,131 @@
+import time
+import cv2
+
+
+INDEX_TIP = 8
+
+
+class FingerJoystick:
+    def __init__(self, hands, center=(0.5, 0.5), dead_zone=0.12, release_zone=0.08,
+                 switch_margin=0.05, max_width=256, roi_margin=0.35, min_roi=0.3,
+                 steady_threshold=0.02, max_skip=4):
+        self.hands = hands
+        self.center = center
+        self.dead_zone = dead_zone
+        self.release_zone = release_zone
+        self.switch_margin = switch_margin
+        self.max_width = max_width
+        self.roi_margin = roi_margin
+        self.min_roi = min_roi
+        self.steady_threshold = steady_threshold
+        self.max_skip = max_skip
+
+        self.roi = None
+        self.landmarks = None
+        self.direction = (0, 0)
+        self.last_tip = None
+        self.skip = 0
+        self.skipped = 0
+        self.inferences = 0
+        self.skipped_frames = 0
+        self.timings = {}
+
+    def process(self, frame):
+        start = time.perf_counter()
+        if self.landmarks is not None and self.skipped < self.skip:
+            self.skipped += 1
+            self.skipped_frames += 1
+            return self.landmarks, self.direction
+        self.skipped = 0
+
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi or (0, 0, width, height)
+        crop = frame[y0:y1, x0:x1]
+
+        t = time.perf_counter()
+        scale = self.max_width / crop.shape[1]
+        if scale < 1:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        self.record("resize", t)
+
+        t = time.perf_counter()
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        self.record("convert", t)
+
+        t = time.perf_counter()
+        results = self.hands.process(rgb)
+        self.inferences += 1
+        self.record("inference", t)
+
+        if results.multi_hand_landmarks:
+            landmarks = results.multi_hand_landmarks[0]
+            for lm in landmarks.landmark:
+                lm.x = (x0 + lm.x * (x1 - x0)) / width
+                lm.y = (y0 + lm.y * (y1 - y0)) / height
+            tip = landmarks.landmark[INDEX_TIP]
+            self.landmarks = landmarks
+            self.roi = self.hand_roi(landmarks, width, height)
+            self.adapt_rate(tip.x, tip.y)
+            self.update_direction(tip.x, tip.y)
+        else:
+            self.landmarks = None
+            self.roi = None
+            self.last_tip = None
+            self.skip = 0
+            self.direction = (0, 0)
+
+        self.record("total", start)
+        return self.landmarks, self.direction
+
+    def hand_roi(self, landmarks, width, height):
+        xs = [lm.x for lm in landmarks.landmark]
+        ys = [lm.y for lm in landmarks.landmark]
+        size = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.roi_margin)
+        size = max(size, self.min_roi)
+        cx = (max(xs) + min(xs)) / 2
+        cy = (max(ys) + min(ys)) / 2
+
+        x0 = max(0, int((cx - size / 2) * width))
+        y0 = max(0, int((cy - size / 2) * height))
+        x1 = min(width, int((cx + size / 2) * width))
+        y1 = min(height, int((cy + size / 2) * height))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def adapt_rate(self, x, y):
+        if self.last_tip is not None:
+            moved = max(abs(x - self.last_tip[0]), abs(y - self.last_tip[1]))
+            if moved < self.steady_threshold:
+                self.skip = min(self.skip + 1, self.max_skip)
+            else:
+                self.skip = 0
+        self.last_tip = (x, y)
+
+    def update_direction(self, x, y):
+        ox = x - self.center[0]
+        oy = y - self.center[1]
+
+        # Hysteresis: hold the current direction until the finger falls back
+        # inside the release zone or the other axis clearly takes over.
+        dx, dy = self.direction
+        if (dx, dy) != (0, 0):
+            along = ox * dx + oy * dy
+            across = abs(oy) if dx else abs(ox)
+            if along > self.release_zone and across < along + self.switch_margin:
+                return
+
+        if max(abs(ox), abs(oy)) < self.dead_zone:
+            self.direction = (0, 0)
+        elif abs(ox) >= abs(oy):
+            self.direction = (1 if ox > 0 else -1, 0)
+        else:
+            self.direction = (0, 1 if oy > 0 else -1)
+
+    def record(self, stage, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        previous = self.timings.get(stage)
+        self.timings[stage] = elapsed if previous is None else previous * 0.9 + elapsed * 0.1
+
+    def stage_timings(self):
+        return dict(self.timings)
@@ -0,0 +1,102 @@
+import mmap
+import os
+import struct
+import numpy as np
+
+# Binary pack layout (little endian):
+#   header  "MAZEPACK", version u16, reserved u16, level count u32
+#   index   one (data offset u64, width u16, height u16, reserved u32) per level
+#   data    each level's tiles as width * height uint8, row major
+PACK_MAGIC = b"MAZEPACK"
+PACK_VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("width", "<u2"), ("height", "<u2"), ("reserved", "<u4")])
+
+
+def load_mazes_from_file(filename):
+    mazes = []
+    current_maze = []
+    with open(filename, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line == "":
+                continue
+            if line.startswith("#"):
+                if current_maze:
+                    mazes.append(current_maze)
+                    current_maze = []
+                continue
+            row = list(map(int, line.split()))
+            current_maze.append(row)
+        if current_maze:
+            mazes.append(current_maze)
+    return mazes
+
+
+def save_mazes_to_file(mazes, filename):
+    with open(filename, "w") as f:
+        for maze in mazes:
+            f.write("#\n")
+            for row in maze:
+                f.write(" ".join(map(str, row)))
+                f.write("\n")
+            f.write("\n")
+
+
+class MazePack:
+    # Levels are read-only views into the memory map, decoded only when indexed.
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = HEADER.unpack_from(self.map, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{filename} is not a maze pack")
+        if version != PACK_VERSION:
+            raise ValueError(f"{filename}: unsupported maze pack version {version}")
+        self.index = np.frombuffer(self.map, dtype=INDEX_DTYPE, count=count, offset=HEADER.size)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, level):
+        offset, width, height, _ = self.index[level].item()
+        return np.frombuffer(self.map, dtype=np.uint8, count=width * height, offset=offset).reshape(height, width)
+
+    def __iter__(self):
+        for level in range(len(self)):
+            yield self[level]
+
+    def close(self):
+        self.index = None
+        self.map.close()
+        self.file.close()
+
+
+def save_maze_pack(mazes, filename):
+    count = len(mazes)
+    index = np.zeros(count, dtype=INDEX_DTYPE)
+    offset = HEADER.size + INDEX_DTYPE.itemsize * count
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, count))
+        f.write(index.tobytes())
+        for level, maze in enumerate(mazes):
+            grid = np.ascontiguousarray(maze, dtype=np.uint8)
+            height, width = grid.shape
+            index[level] = (offset, width, height, 0)
+            f.write(grid.tobytes())
+            offset += grid.size
+        f.seek(HEADER.size)
+        f.write(index.tobytes())
+
+
+def load_mazes(filename):
+    if os.path.splitext(filename)[1] == ".pack":
+        return MazePack(filename)
+    return load_mazes_from_file(filename)
+
+
+def save_mazes(mazes, filename):
+    if os.path.splitext(filename)[1] == ".pack":
+        save_maze_pack(mazes, filename)
+    else:
+        save_mazes_to_file(mazes, filename)
@@ -0,0 +1,224 @@
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+import numpy as np
+from maze_io import load_mazes, save_mazes
+from solver import WALL, PATH, START, GOAL, solve_batch
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAZE_FILE = os.path.join(BASE_DIR, "mazes.txt")
+CHUNK_SIZE = 1024
+
+
+def generate_batch(count, width, height, seed, loops=0.0):
+    # Eller's algorithm run row by row on a whole batch at once: each row's
+    # cells carry set labels, neighbouring sets are merged at random, and every
+    # set sends at least one passage down. The start sits on the left border and
+    # the goal on the right so neither tile is inside a corridor.
+    rng = np.random.default_rng(seed)
+    cols = (width - 1) // 2
+    rows = (height - 1) // 2
+    grid = np.zeros((count, height, width), np.uint8)
+    grid[:, 1:2 * rows:2, 1:2 * cols:2] = PATH
+    labels = np.tile(np.arange(cols), (count, 1))
+
+    for row in range(rows):
+        y = 2 * row + 1
+        last = row == rows - 1
+        for col in range(cols - 1):
+            left = labels[:, col]
+            right = labels[:, col + 1]
+            join = (left != right) & (last | (rng.random(count) < 0.5))
+            if join.any():
+                grid[join, y, 2 * col + 2] = PATH
+                merge = join[:, None] & (labels == right[:, None])
+                labels = np.where(merge, left[:, None], labels)
+        if last:
+            break
+
+        priority = rng.random((count, cols))
+        same_set = labels[:, :, None] == labels[:, None, :]
+        outranked = (same_set & (priority[:, None, :] > priority[:, :, None])).any(axis=2)
+        down = ~outranked | (rng.random((count, cols)) < 0.3)
+        grid[:, y + 1, 1:2 * cols:2][down] = PATH
+        labels = np.where(down, labels, (row + 1) * cols + np.arange(cols))
+
+    if loops > 0:
+        walls = np.zeros((height, width), dtype=bool)
+        walls[1:2 * rows:2, 2:2 * cols:2] = True
+        walls[2:2 * rows - 1:2, 1:2 * cols:2] = True
+        grid[(rng.random(grid.shape) < loops) & walls] = PATH
+
+    grid[:, 1, 0] = START
+    grid[:, 2 * rows - 1, 2 * cols] = GOAL
+    return grid
+
+
+def generate_mazes(count, width, height, seed=None, loops=0.0, workers=None):
+    if width < 3 or height < 3:
+        raise ValueError("mazes must be at least 3x3")
+    seed = random.randrange(2**32) if seed is None else seed
+    jobs = []
+    for i, start in enumerate(range(0, count, CHUNK_SIZE)):
+        jobs.append((min(CHUNK_SIZE, count - start), width, height, seed + i, loops))
+    with Pool(workers) as pool:
+        batches = pool.starmap(generate_batch, jobs)
+    return np.concatenate(batches) if batches else np.zeros((0, height, width), np.uint8)
+
+
+def analyze_batch(grids):
+    passable = grids != WALL
+    padded = np.pad(passable, ((0, 0), (1, 1), (1, 1)))
+    degree = (padded[:, :-2, 1:-1].astype(np.int8) + padded[:, 2:, 1:-1]
+              + padded[:, 1:-1, :-2] + padded[:, 1:-1, 2:])
+    degree = np.where(passable, degree, 0)
+
+    endpoints = (grids == START) | (grids == GOAL)
+    dead_ends = ((degree == 1) & ~endpoints).sum(axis=(1, 2))
+    junctions = (degree >= 3).sum(axis=(1, 2))
+    open_cells = np.maximum((degree >= 1).sum(axis=(1, 2)), 1)
+    branching = (np.maximum(degree - 1, 0).sum(axis=(1, 2))) / open_cells
+
+    return {
+        "path": solve_batch(grids),
+        "dead_ends": dead_ends.astype(np.int32),
+        "junctions": junctions.astype(np.int32),
+        "branching": branching.astype(np.float32),
+    }
+
+
+def analyze_mazes(mazes, workers=None):
+    # Mazes of the same shape are stacked and solved together in chunks.
+    groups = {}
+    for index, maze in enumerate(mazes):
+        grid = np.asarray(maze, dtype=np.uint8)
+        groups.setdefault(grid.shape, []).append((index, grid))
+
+    jobs = []
+    for members in groups.values():
+        for start in range(0, len(members), CHUNK_SIZE):
+            chunk = members[start:start + CHUNK_SIZE]
+            jobs.append(([index for index, _ in chunk], np.stack([grid for _, grid in chunk])))
+
+    stats = {
+        "path": np.full(len(mazes), -1, np.int32),
+        "dead_ends": np.zeros(len(mazes), np.int32),
+        "junctions": np.zeros(len(mazes), np.int32),
+        "branching": np.zeros(len(mazes), np.float32),
+    }
+    with Pool(workers) as pool:
+        results = pool.map(analyze_batch, [grids for _, grids in jobs])
+    for (indices, _), result in zip(jobs, results):
+        for key, values in result.items():
+            stats[key][indices] = values
+
+    stats["difficulty"] = np.where(
+        stats["path"] >= 0,
+        stats["path"] * stats["branching"] + stats["dead_ends"],
+        np.inf,
+    )
+    return stats
+
+
+def print_report(stats, verbose=False):
+    count = len(stats["path"])
+    reachable = stats["path"] >= 0
+    if verbose:
+        print(f"{'level':>6} {'path':>6} {'dead':>6} {'junct':>6} {'branch':>7} {'difficulty':>11}")
+        for i in range(count):
+            path = stats["path"][i] if reachable[i] else "-"
+            print(f"{i + 1:>6} {path:>6} {stats['dead_ends'][i]:>6} {stats['junctions'][i]:>6} "
+                  f"{stats['branching'][i]:>7.3f} {stats['difficulty'][i]:>11.1f}")
+    print(f"{count} mazes, {count - reachable.sum()} unreachable")
+    if reachable.any():
+        paths = stats["path"][reachable]
+        print(f"shortest path: min {paths.min()} mean {paths.mean():.1f} max {paths.max()}")
+        print(f"dead ends: mean {stats['dead_ends'].mean():.1f}, "
+              f"branching factor: mean {stats['branching'].mean():.3f}")
+    for i in np.flatnonzero(~reachable)[:20]:
+        print(f"warning: level {i + 1} has no path from start to goal")
+
+
+def cmd_generate(args):
+    start = time.perf_counter()
+    mazes = generate_mazes(args.count, args.width, args.height, args.seed, args.loops, args.workers)
+    print(f"generated {len(mazes)} mazes in {time.perf_counter() - start:.2f}s")
+    if args.sort:
+        stats = analyze_mazes(mazes, args.workers)
+        mazes = mazes[np.argsort(stats["difficulty"], kind="stable")]
+    save_mazes(mazes, args.output)
+    print(f"saved to {args.output}")
+
+
+def cmd_analyze(args):
+    mazes = load_mazes(args.pack)
+    start = time.perf_counter()
+    stats = analyze_mazes(mazes, args.workers)
+    print(f"analyzed {len(mazes)} mazes in {time.perf_counter() - start:.2f}s")
+    print_report(stats, args.verbose)
+    if args.output:
+        order = np.argsort(stats["difficulty"], kind="stable")
+        save_mazes([mazes[i] for i in order], args.output)
+        print(f"sorted by difficulty into {args.output}")
+
+
+def cmd_pack(args):
+    start = time.perf_counter()
+    mazes = load_mazes(args.source)
+    save_mazes(mazes, args.output)
+    print(f"converted {len(mazes)} mazes into {args.output} in {time.perf_counter() - start:.2f}s")
+
+
+def cmd_bench(args):
+    start = time.perf_counter()
+    mazes = generate_mazes(args.count, args.width, args.height, 0, args.loops, args.workers)
+    generated = time.perf_counter()
+    stats = analyze_mazes(mazes, args.workers)
+    analyzed = time.perf_counter()
+    print(f"{args.count} mazes of {args.width}x{args.height}, {args.workers or os.cpu_count()} workers")
+    print(f"generate: {generated - start:.2f}s")
+    print(f"analyze:  {analyzed - generated:.2f}s")
+    print_report(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and analyze maze packs.")
+    parser.add_argument("--workers", type=int, default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write a pack of random mazes")
+    gen.add_argument("-n", "--count", type=int, default=100)
+    gen.add_argument("-W", "--width", type=int, default=21)
+    gen.add_argument("-H", "--height", type=int, default=21)
+    gen.add_argument("--loops", type=float, default=0.0, help="chance of opening each extra wall")
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("--sort", action="store_true", help="order levels by difficulty")
+    gen.add_argument("-o", "--output", required=True)
+    gen.set_defaults(func=cmd_generate)
+
+    ana = sub.add_parser("analyze", help="report path length, dead ends and branching")
+    ana.add_argument("pack", nargs="?", default=MAZE_FILE)
+    ana.add_argument("-v", "--verbose", action="store_true", help="one line per level")
+    ana.add_argument("-o", "--output", help="write the levels sorted by difficulty")
+    ana.set_defaults(func=cmd_analyze)
+
+    pack = sub.add_parser("pack", help="convert a text pack to the binary .pack format")
+    pack.add_argument("source", nargs="?", default=MAZE_FILE)
+    pack.add_argument("output", nargs="?", default=os.path.join(BASE_DIR, "mazes.pack"))
+    pack.set_defaults(func=cmd_pack)
+
+    bench = sub.add_parser("bench", help="time generation and analysis")
+    bench.add_argument("-n", "--count", type=int, default=10000)
+    bench.add_argument("-W", "--width", type=int, default=50)
+    bench.add_argument("-H", "--height", type=int, default=50)
+    bench.add_argument("--loops", type=float, default=0.05)
+    bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
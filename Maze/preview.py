@@ -0,0 +1,18 @@
+import cv2
+import numpy as np
+import pygame
+
+
+class CameraPreview:
+    # The surface shares memory with self.rgb, so updating the array is the blit.
+    def __init__(self, size=(160, 120)):
+        self.size = size
+        width, height = size
+        self.small = np.empty((height, width, 3), np.uint8)
+        self.rgb = np.empty((height, width, 3), np.uint8)
+        self.surface = pygame.image.frombuffer(self.rgb, size, "RGB")
+
+    def update(self, frame):
+        cv2.resize(frame, self.size, dst=self.small)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.surface
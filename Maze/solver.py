@@ -0,0 +1,124 @@
+import numpy as np
+
+
+WALL, PATH, START, GOAL = 0, 1, 2, 3
+MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class DistanceField:
+    # Distances are measured backwards from every goal tile. Like can_move, the
+    # player may step onto path and goal tiles only, so the start tile gets a
+    # distance but is never expanded.
+    def __init__(self, maze):
+        self.grid = np.asarray(maze, dtype=np.uint8)
+        height, width = self.grid.shape
+        self.width = width
+        self.height = height
+
+        # The BFS runs one whole level per step on flat index arrays. A border of
+        # walls around the grid means a neighbour index never leaves the array
+        # or wraps to another row.
+        stride = width + 2
+        tiles = np.zeros((height + 2, stride), np.uint8)
+        tiles[1:-1, 1:-1] = self.grid
+        tiles = tiles.ravel()
+        distance = np.full(tiles.size, -1, np.int32)
+        step = np.full(tiles.size, -1, np.int8)
+        offsets = np.array([dx + dy * stride for dx, dy in MOVES])
+        moves = np.arange(len(MOVES), dtype=np.int8)
+        last = np.zeros(tiles.size, np.int32)
+
+        frontier = np.flatnonzero(tiles == GOAL)
+        distance[frontier] = 0
+        d = 0
+        while frontier.size:
+            frontier = frontier[tiles[frontier] != START]
+            d += 1
+            # Every tile one move away from the frontier, with the move that
+            # leads from it back into the frontier.
+            neighbour = (frontier[:, None] - offsets).ravel()
+            move = np.tile(moves, frontier.size)
+            new = (distance[neighbour] == -1) & (tiles[neighbour] != WALL)
+            neighbour, move = neighbour[new], move[new]
+            # A tile reached from two frontier tiles keeps one of them.
+            order = np.arange(neighbour.size, dtype=np.int32)
+            last[neighbour] = order
+            keep = last[neighbour] == order
+            frontier = neighbour[keep]
+            distance[frontier] = d
+            step[frontier] = move[keep]
+
+        self.distance = distance.reshape(height + 2, stride)[1:-1, 1:-1].copy()
+        self.step = step.reshape(height + 2, stride)[1:-1, 1:-1].copy()
+
+        starts = np.argwhere(self.grid == START)
+        self.start = (int(starts[0][1]), int(starts[0][0])) if len(starts) else None
+        self.reachable = self.start is not None and self.distance_at(*self.start) >= 0
+
+    def distance_at(self, x, y):
+        return int(self.distance[y, x])
+
+    def next_step(self, x, y):
+        move = self.step[y, x]
+        if move < 0:
+            return None
+        return MOVES[move]
+
+    def next_cell(self, x, y):
+        step = self.next_step(x, y)
+        if step is None:
+            return None
+        return x + step[0], y + step[1]
+
+
+def pack_bits(mask):
+    # (n, h, w) booleans -> (ceil(n / 64), h, w) words, maze i in bit i % 64.
+    count, height, width = mask.shape
+    groups = -(-count // 64)
+    padded = np.zeros((groups * 64, height, width), dtype=bool)
+    padded[:count] = mask
+    packed = np.packbits(padded.reshape(groups, 64, height, width), axis=1, bitorder="little")
+    return np.ascontiguousarray(packed.transpose(0, 2, 3, 1)).view(np.uint64)[..., 0]
+
+
+def unpack_bits(words, count):
+    bits = np.unpackbits(words.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    return bits.reshape(-1)[:count].astype(bool)
+
+
+def solve_batch(grids):
+    # Shortest start-to-goal length for a stack of equally sized mazes. The
+    # BFS frontiers of 64 mazes share one uint64 per cell, so every shift
+    # advances all of them at once. -1 marks mazes whose goal is unreachable.
+    grids = np.asarray(grids, dtype=np.uint8)
+    count = len(grids)
+    lengths = np.full(count, -1, np.int32)
+    if count == 0:
+        return lengths
+
+    enterable = pack_bits((grids == PATH) | (grids == GOAL))
+    standing = pack_bits(grids != WALL)
+    start = pack_bits(grids == START)
+    frontier = pack_bits(grids == GOAL)
+    visited = frontier.copy()
+
+    groups = len(frontier)
+    pending = np.bitwise_or.reduce(start.reshape(groups, -1), axis=1)
+    distance = 0
+    while pending.any() and frontier.any():
+        hit = np.bitwise_or.reduce((frontier & start).reshape(groups, -1), axis=1) & pending
+        if hit.any():
+            lengths[unpack_bits(hit, count)] = distance
+            pending &= ~hit
+
+        spread = frontier & enterable
+        grown = np.zeros_like(spread)
+        grown[:, 1:, :] |= spread[:, :-1, :]
+        grown[:, :-1, :] |= spread[:, 1:, :]
+        grown[:, :, 1:] |= spread[:, :, :-1]
+        grown[:, :, :-1] |= spread[:, :, 1:]
+        frontier = grown & standing & ~visited
+        visited |= frontier
+        distance += 1
+
+    return lengths
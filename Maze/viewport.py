@@ -0,0 +1,97 @@
+from collections import OrderedDict
+import numpy as np
+import pygame
+
+
+class ChunkCache:
+    # Square blocks of chunk_tiles x chunk_tiles tiles are rendered on first use
+    # and kept in an LRU, so memory and render work follow what is on screen.
+    def __init__(self, maze, tile_size, tile_colors, background, chunk_tiles=8, capacity=24):
+        self.grid = np.asarray(maze, dtype=np.uint8)
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.chunk_size = chunk_tiles * tile_size
+        self.capacity = capacity
+        self.palette = np.tile(np.array(background, dtype=np.uint8), (256, 1))
+        for tile, color in tile_colors.items():
+            self.palette[tile] = color
+        self.chunks = OrderedDict()
+        self.rendered = 0
+
+    def get(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        chunk = self.render(cx, cy)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.capacity:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def render(self, cx, cy):
+        n = self.chunk_tiles
+        block = self.grid[cy * n:(cy + 1) * n, cx * n:(cx + 1) * n]
+        pixels = pygame.surfarray.make_surface(self.palette[block].swapaxes(0, 1))
+        height, width = block.shape
+        self.rendered += 1
+        return pygame.transform.scale(pixels, (width * self.tile_size, height * self.tile_size)).convert()
+
+
+class Viewport:
+    def __init__(self, width, height, tile_size, maze_width, maze_height, margin=2):
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.tile_size = tile_size
+        self.margin = margin * tile_size
+        self.bounds = pygame.Rect(0, 0, maze_width * tile_size, maze_height * tile_size)
+
+    def follow(self, x, y):
+        # Scroll only once the player gets within `margin` tiles of an edge, so
+        # most moves stay dirty-rect updates. Returns True when the view moved.
+        target = pygame.Rect(x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size)
+        view = self.rect.copy()
+        inner = view.inflate(-2 * self.margin, -2 * self.margin)
+        if inner.width <= 0 or inner.height <= 0:
+            inner = pygame.Rect(view.center, (0, 0))
+        if target.left < inner.left:
+            view.x -= inner.left - target.left
+        elif target.right > inner.right:
+            view.x += target.right - inner.right
+        if target.top < inner.top:
+            view.y -= inner.top - target.top
+        elif target.bottom > inner.bottom:
+            view.y += target.bottom - inner.bottom
+
+        view.x = max(0, min(view.x, self.bounds.width - view.width)) if self.bounds.width > view.width else 0
+        view.y = max(0, min(view.y, self.bounds.height - view.height)) if self.bounds.height > view.height else 0
+        moved = view.topleft != self.rect.topleft
+        self.rect = view
+        return moved
+
+    def center_on(self, x, y):
+        self.rect.center = (x * self.tile_size + self.tile_size // 2, y * self.tile_size + self.tile_size // 2)
+        self.follow(x, y)
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.tile_size - self.rect.x, y * self.tile_size - self.rect.y,
+                           self.tile_size, self.tile_size)
+
+    def draw(self, surface, cache, background, area=None):
+        area = area or pygame.Rect((0, 0), self.rect.size)
+        world = area.move(self.rect.topleft)
+        surface.fill(background, area)
+
+        size = cache.chunk_size
+        first_x, last_x = world.left // size, (world.right - 1) // size
+        first_y, last_y = world.top // size, (world.bottom - 1) // size
+        rows, cols = cache.grid.shape
+        last_x = min(last_x, (cols - 1) // cache.chunk_tiles)
+        last_y = min(last_y, (rows - 1) // cache.chunk_tiles)
+
+        for cy in range(max(first_y, 0), last_y + 1):
+            for cx in range(max(first_x, 0), last_x + 1):
+                chunk_pos = (cx * size - self.rect.x, cy * size - self.rect.y)
+                clip = area.clip(pygame.Rect(chunk_pos, (size, size)))
+                if clip.width and clip.height:
+                    surface.blit(cache.get(cx, cy), clip, clip.move(-chunk_pos[0], -chunk_pos[1]))
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from models import Puzzle
+from db import make_engine, migrate
+
+CATEGORIES = {"fa": ["اشیاء", "مفهومی", "میوه"], "en": ["objects", "conceptual", "fruit"]}
+
+
+def make_synthetic_db(path, rows, seed=0, upgrade=True):
+    # Bulk-loads `rows` puzzles, alternating languages, into a schema-1 table
+    # and then runs the remaining migrations, so indexes are built once at the end.
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine, target=1)
+    engine.dispose()
+    rng = random.Random(seed)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO puzzles (category, prompt, answer, language) VALUES (?, ?, ?, ?)",
+            ((rng.choice(CATEGORIES[lang]), f"synthetic prompt {i}", f"answer {i}", lang)
+             for i in range(rows) for lang in [("fa", "en")[i % 2]]))
+    conn.close()
+    if upgrade:
+        make_engine(path).dispose()
+    return path
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def queries(session, rows, rng):
+    return {
+        "deck ids by language": lambda: session.scalars(select(Puzzle.id).where(Puzzle.language == "fa")).all(),
+        "deck ids by language+category": lambda: session.scalars(
+            select(Puzzle.id).where(Puzzle.language == "en", Puzzle.category == "fruit")).all(),
+        "count per category": lambda: session.execute(
+            select(Puzzle.category, func.count()).where(Puzzle.language == "fa").group_by(Puzzle.category)).all(),
+        "get by id": lambda: session.get(Puzzle, rng.randint(1, rows)),
+    }
+
+
+def single_row_commits(session, count, tag):
+    for i in range(count):
+        session.add(Puzzle(category="objects", prompt=f"bench {tag} {i}", answer="x", language="en"))
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's queries on a synthetic puzzles.db, before and after the migrations.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--commits", type=int, default=200, help="single-row commits to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        base_path = make_synthetic_db(os.path.join(tmp, "base.db"), args.rows, upgrade=False)
+        tuned_path = os.path.join(tmp, "tuned.db")
+        shutil.copy(base_path, tuned_path)
+        make_engine(tuned_path).dispose()
+        print(f"built {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        engines = {"schema 1, defaults": create_engine(f"sqlite:///{base_path}"),
+                   "migrated + WAL": make_engine(tuned_path)}
+        results = {}
+        for label, engine in engines.items():
+            session = sessionmaker(bind=engine)()
+            rng = random.Random(1)
+            for name, query in queries(session, args.rows, rng).items():
+                repeat = args.repeat * 100 if name == "get by id" else args.repeat
+                results.setdefault(name, {})[label] = timed(query, repeat) * 1000
+            start = time.perf_counter()
+            single_row_commits(session, args.commits, label)
+            results.setdefault(f"{args.commits} single-row commits", {})[label] = (time.perf_counter() - start) * 1000
+            session.close()
+            engine.dispose()
+
+    print(f"{'query (ms)':<32}" + "".join(f"{label:>20}" for label in engines))
+    for name, row in results.items():
+        print(f"{name:<32}" + "".join(f"{row[label]:>20.3f}" for label in engines))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy.orm import sessionmaker
+from models import Puzzle
+from db import make_engine
+from deck import PuzzleDeck
+from bench_db import make_synthetic_db, timed
+
+
+def legacy_pick(session, language, used):
+    available = [p for p in session.query(Puzzle).filter_by(language=language).all() if p.id not in used]
+    puzzle = random.choice(available)
+    used.add(puzzle.id)
+    return puzzle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare puzzle picking with the deck and the full-table query.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 1000, 100_000, 1_000_000])
+    parser.add_argument("--draws", type=int, default=200)
+    parser.add_argument("--legacy-limit", type=int, default=100_000, help="largest size to time the old query on")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'deck build ms':>14} {'draw us':>9} {'legacy pick ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            path = make_synthetic_db(os.path.join(tmp, f"bench_{rows}.db"), rows)
+            session = sessionmaker(bind=make_engine(path))()
+            start = time.perf_counter()
+            deck = PuzzleDeck(session, "fa")
+            build = time.perf_counter() - start
+            draws = min(args.draws, len(deck))
+            draw = timed(deck.draw, draws)
+            legacy = "-"
+            if rows <= args.legacy_limit:
+                used = set()
+                legacy = f"{timed(lambda: legacy_pick(session, 'fa', used), min(5, draws)) * 1000:.1f}"
+            print(f"{rows:>9} {build * 1000:>14.1f} {draw * 1e6:>9.1f} {legacy:>15}")
+            session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import random
+import statistics
+import time
+from matcher import AnswerMatcher
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def random_word(rng):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 9)))
+
+
+def misspell(rng, word):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+
+
+def timed(func, inputs):
+    times = []
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6, max(times) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time answer matching on a generated answer library.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 10_000, 200_000])
+    parser.add_argument("--utterances", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'answers':>8} {'build s':>8} {'match us (median/max)':>22} {'find us (median/max)':>22}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        answers = [(i, " ".join(random_word(rng) for _ in range(rng.randint(1, 2)))) for i in range(size)]
+        start = time.perf_counter()
+        matcher = AnswerMatcher(answers)
+        build = time.perf_counter() - start
+
+        picks = [rng.choice(answers) for _ in range(args.utterances)]
+        said = [f"i think it is {misspell(rng, text)} maybe" for _, text in picks]
+        match = timed(lambda i: matcher.match(picks[i][0], said[i]), range(len(picks)))
+        find = timed(matcher.find, [misspell(rng, text) for _, text in picks])
+        print(f"{size:>8} {build:>8.2f} {match[0]:>12.1f}/{match[1]:<9.1f} {find[0]:>12.1f}/{find[1]:<9.1f}")
+
+
+if __name__ == "__main__":
+    main()
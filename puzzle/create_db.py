@@ -1,10 +1,8 @@
-from sqlalchemy import create_engine
-from models import Base
-import os
+from db import DB_PATH, make_engine, schema_version
+from display import build_display
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-db_path = os.path.join(BASE_DIR,"puzzles.db")
-engine = create_engine(f"sqlite:///{db_path}")
-Base.metadata.create_all(engine)
+# Creates puzzles.db, or brings an existing one up to the current schema.
+engine = make_engine(DB_PATH)
+build_display(engine)
 
-print("Database created!")
+print(f"Database ready at schema version {schema_version(engine)}!")
@@ -0,0 +1,102 @@
+import os
+from sqlalchemy import create_engine, event, text
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "puzzles.db")
+
+# Applied on every new connection. WAL lets the importer write while the game
+# reads; NORMAL sync is safe under WAL and avoids an fsync per commit.
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+]
+
+# Schema changes, in order. The database's PRAGMA user_version records how many
+# have been applied; a step is never edited once shipped, only appended to.
+# Step 1 is the original create_all table, so existing puzzles.db files (at
+# version 0) pick it up as a no-op.
+MIGRATIONS = [
+    [
+        """CREATE TABLE IF NOT EXISTS puzzles (
+            id INTEGER NOT NULL,
+            category VARCHAR,
+            prompt VARCHAR,
+            answer VARCHAR,
+            language VARCHAR,
+            PRIMARY KEY (id),
+            CONSTRAINT uix_prompt UNIQUE (prompt)
+        )""",
+    ],
+    [
+        # The deck deals by language, optionally narrowed to a category.
+        "CREATE INDEX IF NOT EXISTS ix_puzzles_language_category ON puzzles (language, category)",
+        "ANALYZE puzzles",
+    ],
+    [
+        # Other spoken forms accepted for an answer, e.g. "clock" for "wall clock".
+        """CREATE TABLE IF NOT EXISTS puzzle_synonyms (
+            id INTEGER NOT NULL,
+            puzzle_id INTEGER NOT NULL,
+            synonym VARCHAR NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uix_puzzle_synonym UNIQUE (puzzle_id, synonym),
+            FOREIGN KEY(puzzle_id) REFERENCES puzzles (id) ON DELETE CASCADE
+        )""",
+    ],
+    [
+        # Reshaped, visual-order copies of the Persian text, filled by
+        # display.build_display; build_info records which shaping code made them.
+        "ALTER TABLE puzzles ADD COLUMN display_category VARCHAR",
+        "ALTER TABLE puzzles ADD COLUMN display_prompt VARCHAR",
+        "ALTER TABLE puzzles ADD COLUMN display_answer VARCHAR",
+        """CREATE TABLE IF NOT EXISTS build_info (
+            name VARCHAR NOT NULL,
+            version VARCHAR NOT NULL,
+            PRIMARY KEY (name)
+        )""",
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def schema_version(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine, target=SCHEMA_VERSION):
+    version = schema_version(engine)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"{engine.url.database} is at schema version {version}, newer than this code ({SCHEMA_VERSION})")
+    for step in range(version, target):
+        # Each step and its version bump commit together. pysqlite only opens a
+        # transaction before DML, so without this BEGIN every DDL statement
+        # would commit on its own and a failed step would be left half done.
+        with engine.begin() as conn:
+            conn.exec_driver_sql("BEGIN")
+            for statement in MIGRATIONS[step]:
+                conn.execute(text(statement))
+            conn.exec_driver_sql(f"PRAGMA user_version={step + 1}")
+        print(f"Migrated {engine.url.database} to schema version {step + 1}")
+    return max(version, target)
+
+
+def make_engine(path=DB_PATH, upgrade=True):
+    # The one place an engine for puzzles.db (or a copy of it) is built.
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", apply_pragmas)
+    if upgrade:
+        migrate(engine)
+    return engine
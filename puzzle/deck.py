@@ -0,0 +1,33 @@
+import random
+from array import array
+from sqlalchemy import select
+from models import Puzzle
+
+
+class PuzzleDeck:
+    # Deals the puzzles of one language, optionally one category, without
+    # replacement. Only the ids are read up front, into a flat array; each draw
+    # swaps a random remaining id to the end and pops it, then fetches that one
+    # row by primary key, so a draw costs the same for 16 puzzles or a million.
+    def __init__(self, session, language, category=None, rng=None):
+        self.session = session
+        self.rng = rng or random.Random()
+        query = select(Puzzle.id).where(Puzzle.language == language)
+        if category is not None:
+            query = query.where(Puzzle.category == category)
+        self.ids = array("q", session.scalars(query))
+        self.total = len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def draw(self):
+        while self.ids:
+            last = len(self.ids) - 1
+            i = self.rng.randint(0, last)
+            self.ids[i], self.ids[last] = self.ids[last], self.ids[i]
+            puzzle = self.session.get(Puzzle, self.ids.pop())
+            # A row deleted since the deck was dealt is skipped.
+            if puzzle is not None:
+                return puzzle
+        return None
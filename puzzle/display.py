@@ -0,0 +1,65 @@
+from functools import lru_cache
+from importlib.metadata import version
+import arabic_reshaper
+from bidi.algorithm import get_display
+from sqlalchemy import text
+
+# Logical column -> column holding the same text reshaped and in visual order,
+# ready for font.render.
+DISPLAY_COLUMNS = {"category": "display_category", "prompt": "display_prompt", "answer": "display_answer"}
+# Bump when to_display changes; the stored strings are rebuilt on next start.
+DISPLAY_FORMAT = 1
+BATCH_SIZE = 5000
+
+
+def display_version():
+    # The stored strings depend on the shaping libraries as much as on this code.
+    return f"{DISPLAY_FORMAT}/arabic-reshaper {version('arabic-reshaper')}/python-bidi {version('python-bidi')}"
+
+
+@lru_cache(maxsize=512)
+def to_display(value):
+    # Lines with Arabic-script letters are reshaped and reordered; the rest
+    # are kept as they are.
+    lines = []
+    for line in value.split("\n"):
+        if any('\u0600' <= c <= '\u06FF' for c in line):
+            line = get_display(arabic_reshaper.reshape(line))
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def display_fields(row):
+    # Bulk builds bypass the cache, which is kept for text shown at run time.
+    return {display: None if row[name] is None else to_display.__wrapped__(row[name])
+            for name, display in DISPLAY_COLUMNS.items()}
+
+
+def stored_version(conn):
+    return conn.execute(text("SELECT version FROM build_info WHERE name = 'display'")).scalar()
+
+
+def build_display(engine, force=False):
+    # Fills the display columns of every row when they were built by another
+    # version of the shaping code, and otherwise only of rows missing them.
+    current = display_version()
+    with engine.begin() as conn:
+        rebuild = force or stored_version(conn) != current
+        query = "SELECT id, category, prompt, answer FROM puzzles"
+        if not rebuild:
+            query += " WHERE display_prompt IS NULL"
+        result = conn.execute(text(query))
+        update = text("UPDATE puzzles SET " + ", ".join(f"{display} = :{display}" for display in DISPLAY_COLUMNS.values())
+                      + " WHERE id = :id")
+        built = 0
+        while True:
+            rows = result.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            conn.execute(update, [dict(display_fields(row._mapping), id=row.id) for row in rows])
+            built += len(rows)
+        conn.execute(text("INSERT OR REPLACE INTO build_info (name, version) VALUES ('display', :version)"),
+                     {"version": current})
+    if rebuild:
+        print(f"Built display text for {built} puzzle(s) with {current}")
+    return built
@@ -0,0 +1,148 @@
+import argparse
+import csv
+import json
+import os
+import time
+from itertools import islice
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.dialects.sqlite import insert
+from models import Puzzle
+from db import DB_PATH, make_engine
+from display import DISPLAY_COLUMNS, build_display, display_fields
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTENT_FILE = os.path.join(BASE_DIR, "content", "puzzles.jsonl")
+FIELDS = ("category", "prompt", "answer", "language")
+BATCH_SIZE = 5000
+
+# One statement for every batch: new prompts are inserted, a known prompt is
+# updated only when its category, answer or language actually changed, and
+# then its display text along with them.
+puzzles = Puzzle.__table__
+UPDATED = [name for name in FIELDS if name != "prompt"]
+excluded = insert(puzzles).excluded
+UPSERT = insert(puzzles).on_conflict_do_update(
+    index_elements=[puzzles.c.prompt],
+    set_={name: excluded[name] for name in UPDATED + list(DISPLAY_COLUMNS.values())},
+    where=or_(*[puzzles.c[name].is_distinct_from(excluded[name]) for name in UPDATED]),
+)
+# Synonyms only ever accumulate; one already stored for the puzzle is skipped.
+ADD_SYNONYM = text(
+    "INSERT OR IGNORE INTO puzzle_synonyms (puzzle_id, synonym) "
+    "SELECT id, :synonym FROM puzzles WHERE prompt = :prompt")
+
+
+def read_rows(path):
+    # Yields (line, row) one at a time, so a file of any size is never held in memory.
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except ValueError:
+                    yield line_num, None
+
+
+def validate(row):
+    if not isinstance(row, dict):
+        return None, "not a JSON object"
+    missing = [name for name in FIELDS if not isinstance(row.get(name), str) or not row[name].strip()]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    # The prompt is the unique key, so it is stored exactly as written.
+    clean = {name: row[name].strip() for name in FIELDS}
+    clean["prompt"] = row["prompt"]
+    # Optional: a list in JSONL, "|"-separated in CSV.
+    synonyms = row.get("synonyms") or []
+    if isinstance(synonyms, str):
+        synonyms = synonyms.split("|")
+    if not isinstance(synonyms, list) or not all(isinstance(synonym, str) for synonym in synonyms):
+        return None, "synonyms must be a list of strings"
+    clean["synonyms"] = [synonym.strip() for synonym in synonyms if synonym.strip()]
+    return clean, None
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_batch(conn, batch, counts):
+    # New rows always get max(id) + 1, so the growth of max(id) is the number
+    # inserted; the statement's rowcount adds the updated ones, and an
+    # unchanged row touches nothing.
+    before = conn.scalar(select(func.max(puzzles.c.id))) or 0
+    rows = [dict({name: row[name] for name in FIELDS}, **display_fields(row)) for row in batch.values()]
+    changed = conn.execute(UPSERT, rows).rowcount
+    inserted = (conn.scalar(select(func.max(puzzles.c.id))) or 0) - before
+    counts["inserted"] += inserted
+    counts["updated"] += changed - inserted
+    counts["duplicate"] += len(batch) - changed
+    synonyms = [{"prompt": prompt, "synonym": synonym} for prompt, row in batch.items() for synonym in row["synonyms"]]
+    if synonyms:
+        counts["synonyms"] += conn.execute(ADD_SYNONYM, synonyms).rowcount
+
+
+def import_file(engine, path, batch_size=BATCH_SIZE, dry_run=False):
+    counts = {"read": 0, "inserted": 0, "updated": 0, "duplicate": 0, "invalid": 0, "synonyms": 0}
+    errors = []
+    # The whole file goes in one transaction: one fsync, and a failure
+    # part-way leaves the database as it was. A dry run does the same work
+    # and rolls it back, so its counts are exactly what a real run would do.
+    with engine.connect() as conn:
+        with conn.begin() as transaction:
+            for chunk in chunks(read_rows(path), batch_size):
+                batch = {}
+                for line_num, raw in chunk:
+                    counts["read"] += 1
+                    row, error = validate(raw)
+                    if error:
+                        counts["invalid"] += 1
+                        errors.append(f"{path}:{line_num}: {error}")
+                        continue
+                    if row["prompt"] in batch:
+                        counts["duplicate"] += 1
+                    batch[row["prompt"]] = row
+                if batch:
+                    import_batch(conn, batch, counts)
+            if dry_run:
+                transaction.rollback()
+    return counts, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import puzzles from CSV or JSONL files into puzzles.db.")
+    parser.add_argument("files", nargs="*", default=[CONTENT_FILE],
+                        help="CSV (with a header row) or JSONL files with category, prompt, answer, language and optional synonyms")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="validate and count, but write nothing")
+    parser.add_argument("--show-errors", type=int, default=20, help="invalid rows to print per file")
+    args = parser.parse_args()
+
+    engine = make_engine(args.db)
+    # Brings stored display text up to the installed shaping libraries first,
+    # so it matches what this import writes.
+    if not args.dry_run:
+        build_display(engine)
+    for path in args.files:
+        start = time.perf_counter()
+        counts, errors = import_file(engine, path, args.batch_size, args.dry_run)
+        for error in errors[:args.show_errors]:
+            print(error)
+        if len(errors) > args.show_errors:
+            print(f"... and {len(errors) - args.show_errors} more invalid row(s)")
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        prefix = "[dry run] " if args.dry_run else ""
+        print(f"{prefix}{os.path.basename(path)}: {summary} in {time.perf_counter() - start:.2f}s")
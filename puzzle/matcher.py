@@ -0,0 +1,161 @@
+import re
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import select
+from models import Puzzle, Synonym
+
+# Spellings speech engines and keyboards mix up, folded to one form.
+PERSIAN_LETTERS = str.maketrans({
+    "ي": "ی", "ى": "ی", "ئ": "ی", "ك": "ک", "ة": "ه", "ۀ": "ه",
+    "آ": "ا", "أ": "ا", "إ": "ا", "ٱ": "ا", "ؤ": "و",
+    "‌": " ", "‍": "", "ـ": "",
+})
+PERSIAN_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+TOKEN = re.compile(r"[^\W_]+")
+REPEATS = re.compile(r"(.)\1+")
+# Leading words a player may say before the answer ("a mirror", "یه آینه",
+# "I think it's a mirror").
+ARTICLES = {"a", "an", "the", "its", "it", "is", "i", "think", "maybe",
+            "یه", "یک", "این", "شاید", "جواب", "جوابش"}
+# An utterance with any of these is never taken as an answer: "نه آینه نیست",
+# "فکر نکنم" (I don't think so). "نمی" is the split form of "نمی‌کنم" and
+# "نمی‌دونم" once the half-space becomes a space.
+NEGATIONS = {"no", "not", "isnt", "never", "dont", "doesnt", "wasnt", "nope",
+             "نه", "نیست", "نیس", "نیستش", "نبود", "نخیر", "نکنم", "نمی", "نمیکنم",
+             "نمیدونم", "نمیدانم"}
+
+
+def normalize(text):
+    # Lowercase, without diacritics or tatweel, Arabic letters folded to
+    # Persian, split into words.
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("'", "").replace("’", "")
+    return TOKEN.findall(text.translate(PERSIAN_LETTERS).translate(PERSIAN_DIGITS))
+
+
+def strip_articles(words):
+    while len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    return words
+
+
+def make_key(words):
+    # Spaces dropped so "ساعت‌دیواری" and "ساعت دیواری" agree, doubled letters
+    # collapsed so "آیینه" and "آینه" do.
+    return REPEATS.sub(r"\1", "".join(words))
+
+
+def max_edits(key):
+    # Short answers must match exactly: "سیب" and "سبد", "book" and "look"
+    # are one edit apart.
+    if len(key) <= 4:
+        return 0
+    if len(key) <= 8:
+        return 1
+    return 2
+
+
+def within_distance(a, b, limit):
+    # Levenshtein distance <= limit, computed only on the diagonal band that
+    # can stay within it, and abandoned as soon as a whole row exceeds it.
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if a == b:
+        return True
+    if limit == 0:
+        return False
+    big = limit + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        current = [big] * (len(b) + 1)
+        current[0] = i if i <= limit else big
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        if min(current[max(0, low - 1):high + 1]) > limit:
+            return False
+        previous = current
+    return previous[len(b)] <= limit
+
+
+def deletions(key):
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class AnswerMatcher:
+    # Every accepted form of every answer (the answer itself and its rows in
+    # puzzle_synonyms) is normalized once, up front. Checking an utterance then
+    # normalizes it once and compares its first words, as many as the form
+    # has, so an answer said in passing later on does not count.
+    def __init__(self, answers=()):
+        self.forms = defaultdict(list)
+        self.entries = []
+        self.neighbours = defaultdict(list)
+        for puzzle_id, text in answers:
+            self.add(puzzle_id, text)
+
+    def add(self, puzzle_id, text):
+        words = strip_articles(normalize(text))
+        if not words:
+            return
+        key = make_key(words)
+        form = (key, len(words), max_edits(key))
+        if form in self.forms[puzzle_id]:
+            return
+        self.forms[puzzle_id].append(form)
+        # Indexed under the key and each of its one-letter deletions: two keys
+        # one edit apart always share one of these.
+        for variant in deletions(key):
+            self.neighbours[variant].append(len(self.entries))
+        self.entries.append((form, puzzle_id))
+
+    def match(self, puzzle_id, text):
+        # True when the utterance starts with one of the puzzle's accepted forms.
+        words = strip_articles(normalize(text))
+        if NEGATIONS.intersection(words):
+            return False
+        for key, size, limit in self.forms.get(puzzle_id, []):
+            if within_distance(make_key(words[:size]), key, limit):
+                return True
+        return False
+
+    def find(self, text):
+        # Ids of every puzzle the whole utterance answers, looked up through
+        # the deletion index rather than by scanning the library, so it finds
+        # forms up to one edit away whatever the library size.
+        words = strip_articles(normalize(text))
+        if NEGATIONS.intersection(words):
+            return set()
+        key = make_key(words)
+        found = set()
+        for variant in deletions(key):
+            for index in self.neighbours.get(variant, ()):
+                (form, size, limit), puzzle_id = self.entries[index]
+                if puzzle_id not in found and within_distance(key, form, limit):
+                    found.add(puzzle_id)
+        return found
+
+
+def puzzle_forms(session, puzzle):
+    # The answer and its synonyms, read through the (puzzle_id, synonym) index.
+    synonyms = session.scalars(select(Synonym.synonym).where(Synonym.puzzle_id == puzzle.id))
+    return [puzzle.answer] + list(synonyms)
+
+
+def load_puzzle_matcher(session, puzzle, forms=None):
+    # What the game builds for each puzzle drawn: a handful of forms, so it
+    # costs the same whatever the size of the library.
+    forms = puzzle_forms(session, puzzle) if forms is None else forms
+    return AnswerMatcher((puzzle.id, text) for text in forms)
+
+
+def load_matcher(session, language):
+    # Every answer of a language with the deletion index, for offline tooling;
+    # it grows with the library and is too slow to build while playing.
+    answers = session.execute(select(Puzzle.id, Puzzle.answer).where(Puzzle.language == language))
+    synonyms = session.execute(
+        select(Synonym.puzzle_id, Synonym.synonym).join(Puzzle).where(Puzzle.language == language))
+    return AnswerMatcher(list(answers) + list(synonyms))
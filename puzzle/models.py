@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -11,7 +11,23 @@ class Puzzle(Base):
     prompt = Column(String)
     answer = Column(String)
     language = Column(String)
+    display_category = Column(String)
+    display_prompt = Column(String)
+    display_answer = Column(String)
 
     __table_args__ = (
         UniqueConstraint('prompt', name='uix_prompt'),
+        Index('ix_puzzles_language_category', 'language', 'category'),
+    )
+
+
+class Synonym(Base):
+    __tablename__ = 'puzzle_synonyms'
+
+    id = Column(Integer, primary_key=True)
+    puzzle_id = Column(Integer, ForeignKey('puzzles.id', ondelete='CASCADE'), nullable=False)
+    synonym = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('puzzle_id', 'synonym', name='uix_puzzle_synonym'),
     )
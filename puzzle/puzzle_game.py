@@ -2,43 +2,102 @@ import pygame
 import random
 import speech_recognition as sr
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from models import Base, Puzzle
+from db import make_engine
+from display import build_display, to_display
+from deck import PuzzleDeck
+from matcher import load_puzzle_matcher, puzzle_forms
 import os
 import queue
-import arabic_reshaper
-from bidi.algorithm import get_display
 import time
 import sys
-import difflib
 import glob
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from voice import make_recognizer, RecognitionPool, StreamingRecognizer, MicCalibration
+from telemetry import Telemetry
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-db_path = os.path.join(BASE_DIR, "puzzles.db")
-engine = create_engine(f"sqlite:///{db_path}")
+engine = make_engine()
+build_display(engine)
 Session = sessionmaker(bind=engine)
 session = Session()
 
 recognizer = sr.Recognizer()
+speech_backend = make_recognizer()
 mic = sr.Microphone()
-audio_queue = queue.Queue()
+calibration = MicCalibration(recognizer, mic)
+calibration.start()
 
 voice_lang = "en-US"  
+SPEECH_EVENT = pygame.event.custom_type()
+BLINK_MS = 500
+
+
+def notify_speech():
+    # Called from recognizer threads; wakes the main loop out of event.wait.
+    pygame.event.post(pygame.event.Event(SPEECH_EVENT))
+
+
+recognition_pool = RecognitionPool(speech_backend, voice_lang, on_ready=notify_speech)
+try:
+    # With a local engine the answer is checked while the player is speaking.
+    streamer = StreamingRecognizer(speech_backend, voice_lang, on_event=notify_speech)
+except RuntimeError:
+    streamer = None
+telemetry = Telemetry(os.path.join(BASE_DIR, "telemetry.jsonl"))
+ERROR_INPUTS = {"unknown_value": "__speech_not_understood__", "request": "__speech_service_error__",
+                "other": "__unknown_error__"}
+EXIT_PHRASES = ["exit", "خروج"]
+SKIP_PHRASES = ["i don't know", "نمی‌دونم", "نمیدونم"]
 
 def callback(recognizer, audio):
-    try:
-        text = recognizer.recognize_google(audio, language=voice_lang)
-        audio_queue.put(text.lower().strip())
-    except sr.UnknownValueError:
-        audio_queue.put("__speech_not_understood__")
-    except sr.RequestError:
-        audio_queue.put("__speech_service_error__")
-    except Exception as e:
-        audio_queue.put("__unknown_error__")
+    recognition_pool.submit(audio)
+
+
+def get_audio_input():
+    # Returns (text, is_partial, time the phrase started), or (None, False, None).
+    if streamer is not None:
+        event = streamer.poll()
+        if event is None:
+            return None, False, None
+        return event.text.lower(), event.kind == "partial", event.started_at
+    result = recognition_pool.poll()
+    if result is None:
+        return None, False, None
+    return ERROR_INPUTS[result.error] if result.error else result.text, False, result.started_at
+
 
+def start_listening():
+    calibration.wait()
+    if streamer is not None:
+        streamer.language = voice_lang
+        return streamer.start(mic)
+    recognition_pool.language = voice_lang
+    return recognizer.listen_in_background(mic, callback)
+
+
+def next_generation():
+    recognition_pool.new_generation()
+    if streamer is not None:
+        streamer.new_generation()
+
+
+def save_telemetry():
+    calibration.remember()
+    stats = recognition_pool.stats()
+    if streamer is not None:
+        stats["dropped_stale"] += streamer.dropped_stale
+    telemetry.save(mode="streaming" if streamer else "phrase", backend=speech_backend.name,
+                   language=voice_lang, recognition=stats)
+
+
+def wait_for_wakeup(blinking):
+    # Sleeps until an input or speech event arrives, or until the mic icon's
+    # next blink while it is on screen. Returns the event that woke the loop.
+    timeout = BLINK_MS - int(time.time() * 1000) % BLINK_MS if blinking else 0
+    event = pygame.event.wait(timeout)
+    return [] if event.type == pygame.NOEVENT else [event]
 
-def normalize_answer(ans):
-    return ans.strip().lower()
 
 pygame.init()
 pygame.mixer.init()
@@ -77,16 +136,14 @@ def load_random_background():
     img = pygame.image.load(path)
     return pygame.transform.scale(img, (WIDTH, HEIGHT))
 
-def draw_text(text, y, color=WHITE, x=40):
+def draw_text(text, y, color=WHITE, x=40, shaped=False):
+    # Puzzle text comes from the display_* columns already shaped; anything
+    # else goes through to_display, which caches what it has seen.
+    if not shaped:
+        text = to_display(text)
     lines = text.split('\n')
     for i, line in enumerate(lines):
-        if any('\u0600' <= c <= '\u06FF' for c in line):
-
-            reshaped_text = arabic_reshaper.reshape(line)
-            bidi_text = get_display(reshaped_text)
-            rendered = font.render(bidi_text, True, color)
-        else:
-            rendered = font.render(line, True, color)
+        rendered = font.render(line, True, color)
         screen.blit(rendered, (x, y + i*40))
 
 
@@ -157,10 +214,11 @@ def main():
     puzzle = None
     message = ""
     stop_listening = None
-    sleep_time = 0
+    woken_by = []
     score = 0
     show_help = False
-    used_puzzles = set()
+    deck = None
+    matcher = None
     correct_count = 0
     wrong_count = 0
     background = None
@@ -180,16 +238,17 @@ def main():
 
         if message:
                 draw_text(message, 350)
-        time.sleep(sleep_time)
-        sleep_time = 0
 
-        for event in pygame.event.get():
+        redraw_now = False
+        for event in woken_by + pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+                save_telemetry()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_q:
+                    save_telemetry()
                     pygame.quit()
                     sys.exit()
                 if state == "choose_lang":
@@ -204,9 +263,8 @@ def main():
                     elif event.key == pygame.K_h:
                         show_help = not show_help
                     if state == "game":
-                        with mic as source:
-                            recognizer.adjust_for_ambient_noise(source)
-                        stop_listening = recognizer.listen_in_background(mic, callback)
+                        deck = PuzzleDeck(session, lang)
+                        stop_listening = start_listening()
         
         if state == "choose_lang":
             if show_help:
@@ -222,51 +280,68 @@ def main():
         elif state == "game":
             if not puzzle:
                 current_character_image = random.choice(character_sets[character_state])
-                available = [p for p in session.query(Puzzle).filter_by(language=lang).all() if p.id not in used_puzzles]
-                if not available:
+                puzzle = deck.draw()
+                if not puzzle:
                     current_character_image = None
                     message = "All puzzles completed!"
                     state = "end"
+                    redraw_now = True
                 else:
-                    puzzle = random.choice(available)
-                    used_puzzles.add(puzzle.id)
+                    forms = puzzle_forms(session, puzzle)
+                    matcher = load_puzzle_matcher(session, puzzle, forms)
+                    if speech_backend.uses_keywords:
+                        # Keyword spotting backends only listen for the commands
+                        # and this puzzle's answers.
+                        speech_backend.set_keywords(EXIT_PHRASES + SKIP_PHRASES + forms)
+                    next_generation()
                     background = load_random_background()
                     message = ""
+                    redraw_now = True
             else:
                 if character_state == "thinking":
                     img = pygame.transform.scale(current_character_image, (200, 200))
                     screen.blit(img, (WIDTH - img.get_width() - 30, HEIGHT - img.get_height() - 30))
 
                 draw_text(f"Score: {score}", 20, RED)
-                draw_text(f"Category: {puzzle.category}", 70, DARK_BLUE)
+                draw_text(f"Category: {puzzle.display_category}", 70, DARK_BLUE, shaped=True)
                 draw_text("Puzzle:", 110 , color=DARK_BLUE)
-                draw_text(puzzle.prompt, 160 , color=WHITE)
+                draw_text(puzzle.display_prompt, 160 , color=WHITE, shaped=True)
 
                 if int(time.time() * 2) % 2 == 0:
                     screen.blit(mic_icon, (1150, 90))
 
                 try:
-                    user_input = audio_queue.get_nowait()
-                    if user_input:
+                    # Take every result that is ready; the events that announced them
+                    # were all consumed by this wakeup.
+                    while puzzle is not None and state == "game":
+                        user_input, partial, started_at = get_audio_input()
+                        if user_input is None:
+                            break
+                        if partial:
+                            # A partial only counts once it already contains the answer.
+                            if not matcher.match(puzzle.id, user_input):
+                                continue
+                            user_input = puzzle.answer
                         if user_input == "__speech_not_understood__":
                             message = "Didn't catch that."
                         elif user_input == "__speech_service_error__":
                             message = "Connection problem."
                         elif user_input == "__unknown_error__":
                             message = "An unknown error occurred."
-                        elif user_input in ["exit", "خروج"]:
+                        elif user_input in EXIT_PHRASES:
                             current_character_image = None
                             message = ""
                             state = "end"
-                        elif user_input in ["i don't know", "نمی‌دونم", "نمیدونم"]:
+                            redraw_now = True
+                        elif user_input in SKIP_PHRASES:
                             # message = f"The correct answer was: {puzzle.answer}"
                             puzzle = None
                             wrong_sound.play()
-                            # sleep_time = 3
                             score -= 1
                             wrong_count += 1
-                        elif normalize_answer(user_input) == normalize_answer(puzzle.answer):
+                        elif matcher.match(puzzle.id, user_input):
                             message = "Correct!"
+                            telemetry.record("time_to_accept", time.perf_counter() - started_at)
                             puzzle = None
                             correct_sound.play()
                             score += 2
@@ -292,7 +367,11 @@ def main():
 
             
         pygame.display.flip()
-        pygame.time.wait(100)
+        if redraw_now or (state == "game" and not puzzle):
+            # A puzzle was just answered or picked: show the next one right away.
+            woken_by = []
+            continue
+        woken_by = wait_for_wakeup(state == "game")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import json
+import time
+
+
+class Telemetry:
+    # Timings gathered over one session, printed and appended to a JSON-lines
+    # log when the game exits so runs can be compared.
+    def __init__(self, path):
+        self.path = path
+        self.samples = {}
+
+    def record(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        report = {}
+        for name, values in self.samples.items():
+            values = sorted(values)
+            report[name] = {
+                "count": len(values),
+                "median_ms": round(1000 * values[len(values) // 2], 1),
+                "p95_ms": round(1000 * values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+                "max_ms": round(1000 * values[-1], 1),
+            }
+        return report
+
+    def save(self, **details):
+        report = self.summary()
+        print("Telemetry:", report)
+        if not report:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), **details, "metrics": report}, ensure_ascii=False) + "\n")
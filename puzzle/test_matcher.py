@@ -0,0 +1,54 @@
+import pytest
+from matcher import AnswerMatcher
+
+ANSWERS = [
+    (1, "آینه"), (1, "آیینه"),
+    (2, "wall clock"), (2, "clock"),
+    (3, "فکر"),
+    (4, "سیب"),
+    (5, "ساعت دیواری"),
+]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return AnswerMatcher(ANSWERS)
+
+
+@pytest.mark.parametrize("puzzle_id, text, expected", [
+    (1, "آینه", True),
+    (1, "یه آینه", True),
+    (1, "آيينه", True),
+    (1, "آینه‌", True),
+    (1, "شاید آینه باشه", True),
+    (2, "I think it's a clock", True),
+    (2, "wall clocks", True),
+    (5, "ساعت‌دیواری", True),
+    (3, "فکر", True),
+    # Negated, in either language.
+    (1, "نه آینه نیست", False),
+    (1, "آینه نیست", False),
+    (2, "it's not a clock", False),
+    (2, "I don't think it's a clock", False),
+    (3, "فکر نکنم", False),
+    (3, "فکر نمی‌کنم", False),
+    (1, "نمی‌دونم آینه", False),
+    # Said in passing after something else, or too far off for a short answer.
+    (1, "میز یا آینه", False),
+    (4, "سبد", False),
+    (2, "a watch", False),
+    (2, "", False),
+    (6, "آینه", False),
+])
+def test_match(matcher, puzzle_id, text, expected):
+    assert matcher.match(puzzle_id, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("آینه", {1}),
+    ("clock", {2}),
+    ("clocc", {2}),
+    ("آینه نیست", set()),
+])
+def test_find(matcher, text, expected):
+    assert matcher.find(text) == expected
@@ -0,0 +1,78 @@
+import argparse
+from solver import Solver, SearchBudgetExceeded, DIRECTIONS
+
+# Boards in the usual notation: tiles 1..n*n-1, 0 for the empty cell, goal with
+# the empty cell last. (name, size, board, optimal length)
+INSTANCES = [
+    ("3x3 hardest A", 3, [8, 6, 7, 2, 5, 4, 3, 0, 1], 31),
+    ("3x3 hardest B", 3, [6, 4, 7, 8, 5, 0, 3, 2, 1], 31),
+]
+
+# Korf (1985) instances, given with the empty cell first in the goal. They are
+# rotated by 180 degrees below, which keeps their optimal lengths.
+KORF = [
+    ([14, 13, 15, 7, 11, 12, 9, 5, 6, 0, 2, 1, 4, 8, 10, 3], 57),
+    ([13, 5, 4, 10, 9, 12, 8, 14, 2, 3, 7, 1, 0, 15, 11, 6], 55),
+    ([14, 7, 8, 2, 13, 11, 10, 4, 9, 12, 5, 0, 3, 6, 1, 15], 59),
+    ([5, 12, 10, 7, 15, 11, 14, 0, 8, 2, 1, 13, 3, 4, 9, 6], 56),
+    ([4, 7, 14, 13, 10, 3, 9, 12, 11, 5, 6, 15, 1, 2, 8, 0], 56),
+]
+
+
+def to_order(board, size):
+    blank = size * size - 1
+    return [blank if value == 0 else value - 1 for value in board]
+
+
+def korf_to_board(korf):
+    board = [0] * 16
+    for pos, value in enumerate(korf):
+        board[15 - pos] = 0 if value == 0 else 16 - value
+    return board
+
+
+def apply_moves(order, moves, size):
+    order = list(order)
+    blank = order.index(size * size - 1)
+    for move in moves:
+        dr, dc = DIRECTIONS[move]
+        target = blank + dr * size + dc
+        order[blank], order[target] = order[target], order[blank]
+        blank = target
+    return order
+
+
+def instances():
+    yield from INSTANCES
+    for i, (korf, length) in enumerate(KORF, 1):
+        yield f"4x4 Korf #{i}", 4, korf_to_board(korf), length
+
+
+def run(max_nodes, time_limit, make_solver=Solver):
+    print(f"{'instance':16} {'moves':>6} {'optimal':>8} {'nodes':>10} {'seconds':>8}  result")
+    for name, size, board, optimal in instances():
+        order = to_order(board, size)
+        solver = make_solver(size, max_nodes, time_limit)
+        try:
+            moves = solver.solve(order)
+        except SearchBudgetExceeded as e:
+            print(f"{name:16} {'-':>6} {optimal:>8} {solver.nodes:>10} {solver.elapsed:>8.2f}  {e}")
+            continue
+        solved = apply_moves(order, moves, size) == list(range(size * size))
+        status = "ok" if solved and len(moves) == optimal else "WRONG"
+        print(f"{name:16} {len(moves):>6} {optimal:>8} {solver.nodes:>10} {solver.elapsed:>8.2f}  {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sliding puzzle solver.")
+    parser.add_argument("--max-nodes", type=int, default=5_000_000)
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    parser.add_argument("--pdb", action="store_true", help="use the built pattern databases")
+    args = parser.parse_args()
+    if args.pdb:
+        from pattern_db import load_pattern_db
+        databases = {size: load_pattern_db(size) for size in (3, 4)}
+        run(args.max_nodes, args.time_limit,
+            lambda size, max_nodes, time_limit: Solver(size, max_nodes, time_limit, heuristic=databases[size]))
+    else:
+        run(args.max_nodes, args.time_limit)
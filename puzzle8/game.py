@@ -1,22 +1,39 @@
 import pygame
 import os
+import sys
 import random
 import speech_recognition as sr
 import threading
+import subprocess
 import queue
 import arabic_reshaper
 from bidi.algorithm import get_display
+from solver import Solver, SearchBudgetExceeded, is_solvable, OPPOSITE
+from state_table import load_state_table
+from pattern_db import load_pattern_db
+from tile_cache import TileAtlasCache
+from voice_commands import parse_command, VOCABULARY
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from voice import make_recognizer, RecognitionPool, MicCalibration
 
 base_dir = os.path.dirname(os.path.abspath(__file__))
 TILES_BASE_FOLDER = os.path.join(base_dir, "tiles")  
+IMAGES_FOLDER = os.path.join(base_dir, "images")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
 ICON_PATH = os.path.join(base_dir, "assets", "refresh.png")
 HELP_ICON_PATH = os.path.join(base_dir, "assets", "help.png")
 
 recognizer = sr.Recognizer()
+speech_backend = make_recognizer(keywords=VOCABULARY)
 mic = sr.Microphone()
-audio_queue = queue.Queue()
+calibration = MicCalibration(recognizer, mic)
+calibration.start()
+recognition_pool = RecognitionPool(speech_backend, "fa-IR")
+stop_listening = None
+ERROR_MESSAGES = {"unknown_value": "متوجه نشدم", "request": "سرویس ارور", "other": "ارور ناشناخته"}
 
-GRID_SIZE = 3
+GRID_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 3
 TILE_SIZE = 100
 HEADER_HEIGHT = 75
 WINDOW_WIDTH = GRID_SIZE * TILE_SIZE
@@ -24,23 +41,67 @@ WINDOW_HEIGHT = GRID_SIZE * TILE_SIZE + HEADER_HEIGHT
 
 REFRESH_BUTTON_POS = (WINDOW_WIDTH - 50, 30)
 REFRESH_BUTTON_SIZE = (32, 32)
+HINT_MAX_NODES = 2000000
+# (weight, seconds): an optimal search first, then weighted ones that give up
+# a few moves of length to finish in time on hard 4x4 boards.
+HINT_STAGES = [(1, 2.0), (1.5, 3.0), (2, 5.0)]
+AUTO_SOLVE_DELAY = 300
+FPS = 30
+DIFFICULTY_DEPTHS = {"easy": 10, "medium": 18, "hard": 26}
+DIFFICULTY_KEYS = {pygame.K_1: "easy", pygame.K_2: "medium", pygame.K_3: "hard"}
+KEY_DIRECTIONS = {pygame.K_UP: "up", pygame.K_DOWN: "down", pygame.K_LEFT: "left", pygame.K_RIGHT: "right"}
+state_table = load_state_table() if GRID_SIZE == 3 else None
+
+
+def build_state_table():
+    # The BFS runs in its own process so the window stays responsive; until it
+    # is done boards are shuffled at random and hints use the search.
+    global state_table
+    subprocess.run([sys.executable, os.path.join(base_dir, "state_table.py")], stdout=subprocess.DEVNULL)
+    state_table = load_state_table()
+    print("3x3 state table ready" if state_table else "Building the 3x3 state table failed")
+
+
+if GRID_SIZE == 3 and state_table is None:
+    print("No 3x3 state table yet, building it in the background (python state_table.py builds it ahead of time)")
+    threading.Thread(target=build_state_table, daemon=True).start()
+pattern_db = load_pattern_db(GRID_SIZE) if GRID_SIZE > 3 else None
+if GRID_SIZE > 3 and pattern_db is None:
+    print(f"No pattern database for {GRID_SIZE}x{GRID_SIZE}, hints will be slow. "
+          f"Build one with: python pattern_db.py build {GRID_SIZE}")
 WIN_MUSIC_PATH = os.path.join(base_dir, "assets", "win.wav")
 win_image = pygame.image.load(os.path.join(base_dir, "assets", "win_image.png"))
 win_image = pygame.transform.scale(win_image, (200, 200)) 
 
-def choose_random_tile_folder():
-    folders = [f for f in os.listdir(TILES_BASE_FOLDER) if os.path.isdir(os.path.join(TILES_BASE_FOLDER, f))]
-    chosen = random.choice(folders)
-    return os.path.join(TILES_BASE_FOLDER, chosen)
-
-def load_tiles(tile_folder):
-    tiles = []
-    for i in range(GRID_SIZE * GRID_SIZE):
-        tile_path = os.path.join(tile_folder, f"tile_{i}.png")
-        image = pygame.image.load(tile_path)
-        image = pygame.transform.scale(image, (TILE_SIZE, TILE_SIZE))
-        tiles.append(image)
-    return tiles
+def has_all_tiles(folder):
+    # Every tile of this grid size and none beyond it; a half-cut folder would
+    # only fail later, when it is decoded.
+    tile_count = GRID_SIZE * GRID_SIZE
+    return (all(os.path.exists(os.path.join(folder, f"tile_{i}.png")) for i in range(tile_count))
+            and not os.path.exists(os.path.join(folder, f"tile_{tile_count}.png")))
+
+def list_pictures():
+    pictures = [os.path.join(IMAGES_FOLDER, f) for f in os.listdir(IMAGES_FOLDER)
+                if f.lower().endswith(IMAGE_EXTENSIONS)]
+    # Folders cut by image_splitter.py still work for the grid size they were
+    # cut for, unless their source picture is in images/ anyway.
+    names = {os.path.splitext(os.path.basename(p))[0] for p in pictures}
+    if os.path.isdir(TILES_BASE_FOLDER):
+        for f in os.listdir(TILES_BASE_FOLDER):
+            folder = os.path.join(TILES_BASE_FOLDER, f)
+            if f not in names and has_all_tiles(folder):
+                pictures.append(folder)
+    return pictures
+
+def choose_random_picture():
+    return random.choice(list_pictures())
+
+def load_tiles(tile_cache, picture):
+    # Show picture and start decoding the one the next refresh will use.
+    tiles = tile_cache.get(picture)
+    next_picture = choose_random_picture()
+    tile_cache.prefetch(next_picture)
+    return tiles, next_picture
 
 def draw_grid(screen, tiles, order):
     index = 0
@@ -56,14 +117,26 @@ def is_solved(order):
     return order == list(range(GRID_SIZE * GRID_SIZE))
 
 
-def generate_shuffled_order():
+def generate_shuffled_order(difficulty="medium"):
+    if state_table is not None:
+        return state_table.random_order(DIFFICULTY_DEPTHS[difficulty])
     order = list(range(GRID_SIZE * GRID_SIZE))
     while True:
         random.shuffle(order)
+        if not is_solvable(order, GRID_SIZE):
+            blank = GRID_SIZE * GRID_SIZE - 1
+            a, b = [i for i, tile in enumerate(order) if tile != blank][:2]
+            order[a], order[b] = order[b], order[a]
         if not is_solved(order):
             return order
 
 
+def moves_remaining(order):
+    if state_table is None:
+        return None
+    return state_table.distance(order)
+
+
 def is_refresh_clicked(mouse_pos):
     x, y = mouse_pos
     rx, ry = REFRESH_BUTTON_POS
@@ -88,34 +161,131 @@ def move_empty(order, direction):
     order[empty_index], order[target] = order[target], order[empty_index]
     return order
 
+def apply_batch(order, moves):
+    # Plays moves in order and returns the ones that were legal, for undo.
+    blank_tile = GRID_SIZE * GRID_SIZE - 1
+    applied = []
+    for direction in moves:
+        blank = order.index(blank_tile)
+        order = move_empty(order, direction)
+        if order[blank] != blank_tile:
+            applied.append(direction)
+    return order, applied
+
+def undo_batch(order, history):
+    if not history:
+        return order
+    order, _ = apply_batch(order, [OPPOSITE[direction] for direction in reversed(history.pop())])
+    return order
+
+def table_plan(order):
+    # With the 3x3 table the whole optimal path is a walk down the distances.
+    order = list(order)
+    plan = []
+    move = state_table.next_move(order)
+    while move:
+        plan.append(move)
+        order = move_empty(order, move)
+        move = state_table.next_move(order)
+    return plan
+
+
+class HintPlanner:
+    # Searches for a solution on a worker thread so the window keeps drawing.
+    # Each result carries the board it solves; the game ignores one for a board
+    # that is no longer on screen. moves is None when every stage ran out, and
+    # weight is the stage that found them (1 is optimal).
+    def __init__(self):
+        self.results = queue.Queue()
+        self.cancel = threading.Event()
+        self.searching = None
+
+    def request(self, order):
+        board = tuple(order)
+        if self.searching == board:
+            return
+        self.stop()
+        self.cancel = threading.Event()
+        self.searching = board
+        threading.Thread(target=self.search, args=(board, self.cancel), daemon=True).start()
+
+    def search(self, board, cancel):
+        moves = None
+        for weight, time_limit in HINT_STAGES:
+            solver = Solver(GRID_SIZE, HINT_MAX_NODES, time_limit, heuristic=pattern_db, cancel=cancel, weight=weight)
+            try:
+                moves = solver.solve(list(board))
+                break
+            except SearchBudgetExceeded as e:
+                print(f"No solution found at weight {weight}: {e} after {solver.nodes} nodes")
+            if cancel.is_set():
+                return
+        if not cancel.is_set():
+            self.results.put((board, moves, weight))
+
+    def poll(self):
+        try:
+            board, moves, weight = self.results.get_nowait()
+        except queue.Empty:
+            return None
+        if board == self.searching:
+            self.searching = None
+        return board, moves, weight
+
+    def stop(self):
+        self.cancel.set()
+        self.searching = None
+
+
+def play_hint(order, plan, plan_board, history, planner):
+    # Plays the next move of the plan for this board, recording it for undo.
+    # Returns False as the last value when there is no plan yet and a search
+    # has been started instead.
+    board = tuple(order)
+    if plan_board != board:
+        if state_table is None:
+            planner.request(order)
+            return order, [], None, False
+        plan, plan_board = table_plan(order), board
+    if not plan:
+        return order, plan, plan_board, True
+    order, applied = apply_batch(order, plan[:1])
+    history.append(applied)
+    return order, plan[1:], tuple(order), True
+
 def audio_callback(recognizer, audio):
-    try:
-        text = recognizer.recognize_google(audio, language="fa-IR")
-        print("Heard:", text)
-        audio_queue.put(text.lower().strip())
-    except sr.UnknownValueError:
-        print("Could not understand audio")
-        audio_queue.put("متوجه نشدم")
-    except sr.RequestError:
-        print("Speech recognition service error")
-        audio_queue.put("سرویس ارور")
-    except Exception as e:
-        print("Unknown error:", e)
-        audio_queue.put("ارور ناشناخته")
+    recognition_pool.submit(audio)
 
 
 def start_listening():
+    # Only called once calibration is ready, and only when no listener is running.
     global stop_listening
-    with mic as source:
-        recognizer.adjust_for_ambient_noise(source)
     stop_listening = recognizer.listen_in_background(mic, audio_callback)
 
 
+def stop_mic():
+    global stop_listening
+    if stop_listening is not None:
+        stop_listening(wait_for_stop=False)
+        stop_listening = None
+
+
+def recalibrate():
+    # The calibration thread stops the running listener itself, off the UI thread.
+    global stop_listening
+    calibration.start(force=True, stop_listening=stop_listening)
+    stop_listening = None
+
+
 def get_audio_input():
-    try:
-        return audio_queue.get_nowait()
-    except queue.Empty:
+    result = recognition_pool.poll()
+    if result is None:
         return None
+    if result.error:
+        print("Could not recognize audio:", result.error)
+        return ERROR_MESSAGES[result.error]
+    print("Heard:", result.text)
+    return result.text
     
 def normalize_answer(answer):
     return answer.strip().lower()
@@ -131,12 +301,19 @@ def draw_help_screen(screen, font):
     "    paaeen -> Move down",
     "    chap -> Move left",
     "    raast -> Move right",
+    "    raahnamaa -> Play the next best move",
+    "    hal -> Solve the puzzle",
+    "    bargard -> Undo the last batch of moves (or press U)",
+    "    Several moves at once: baalaa baalaa chap, do baar raast",
     "",
     "* Keyboard Controls (when mic is OFF):",
     "    Arrow keys -> Move tiles",
     "",
+    "* Press N for a hint move, S to auto-solve.",
+    "* Press 1, 2 or 3 for an easy, medium or hard shuffle.",
     "* Press R or click the refresh icon to reshuffle tiles.",
     "* Click the mic icon to turn voice input on/off.",
+    "* Press C to recalibrate the microphone.",
     "* Press H to toggle this help screen.",
     "* Press Q to Exit.",
     "",
@@ -187,40 +364,63 @@ def main():
 
     mic_active = True
     showing_help = False
-
-    tile_folder = choose_random_tile_folder()
-    tiles = load_tiles(tile_folder)
-    shuffled_order = generate_shuffled_order()
-
-    start_listening()
+    difficulty = "medium"
+    small_font = pygame.font.Font(base_dir+"/assets/Vazirmatn-Regular.ttf", 12)
+
+    tile_cache = TileAtlasCache(GRID_SIZE, TILE_SIZE)
+    tiles, next_picture = load_tiles(tile_cache, choose_random_picture())
+    shuffled_order = generate_shuffled_order(difficulty)
+    history = []
+
+    plan = []
+    plan_board = None
+    planner = HintPlanner()
+    hint_pending = False
+    auto_solving = False
+    last_auto_move = 0
+    clock = pygame.time.Clock()
+
+    # The listener starts from the main loop once calibration is done, so
+    # neither startup nor the mic button waits for it.
+    listen_when_ready = True
     game_won = False
 
     running = True
     while running:
+        # Capped so the loop leaves the search thread most of the CPU.
+        clock.tick(FPS)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             elif game_won and event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                 pygame.mixer.music.stop()
-                tile_folder = choose_random_tile_folder()
-                tiles = load_tiles(tile_folder)
-                shuffled_order = generate_shuffled_order()
+                tiles, next_picture = load_tiles(tile_cache, next_picture)
+                shuffled_order = generate_shuffled_order(difficulty)
+                history = []
+                recognition_pool.new_generation()
                 last_voice_command = ""
+                planner.stop()
+                hint_pending = False
+                auto_solving = False
                 game_won = False
+                listen_when_ready = mic_active
 
             if not game_won:    
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if is_refresh_clicked(event.pos):
-                        tile_folder = choose_random_tile_folder()
-                        tiles = load_tiles(tile_folder)
-                        shuffled_order = generate_shuffled_order()
+                        tiles, next_picture = load_tiles(tile_cache, next_picture)
+                        shuffled_order = generate_shuffled_order(difficulty)
+                        history = []
+                        recognition_pool.new_generation()
+                        planner.stop()
+                        hint_pending = False
+                        auto_solving = False
                     if mic_icon_rect.collidepoint(event.pos):
                         mic_active = not mic_active
-                        if mic_active:
-                            start_listening()
-                        else:
-                            stop_listening(wait_for_stop=False)
+                        listen_when_ready = mic_active
+                        if not mic_active:
+                            stop_mic()
                     if help_icon_rect.collidepoint(event.pos):
                         showing_help = not showing_help
 
@@ -228,24 +428,49 @@ def main():
                     if event.key == pygame.K_q:
                             running = False
                     if event.key == pygame.K_r:
-                        tile_folder = choose_random_tile_folder()
-                        tiles = load_tiles(tile_folder)
-                        shuffled_order = generate_shuffled_order()
+                        tiles, next_picture = load_tiles(tile_cache, next_picture)
+                        shuffled_order = generate_shuffled_order(difficulty)
+                        history = []
+                        recognition_pool.new_generation()
+                        planner.stop()
+                        hint_pending = False
+                        auto_solving = False
                     elif event.key == pygame.K_h:
                         showing_help = not showing_help
-                    elif not mic_active:
-                        if event.key == pygame.K_UP:
-                            shuffled_order = move_empty(shuffled_order, "up")
-                            last_voice_command = "up"
-                        elif event.key == pygame.K_DOWN:
-                            shuffled_order = move_empty(shuffled_order, "down")
-                            last_voice_command = "down"
-                        elif event.key == pygame.K_LEFT:
-                            shuffled_order = move_empty(shuffled_order, "left")
-                            last_voice_command = "left"
-                        elif event.key == pygame.K_RIGHT:
-                            shuffled_order = move_empty(shuffled_order, "right")
-                            last_voice_command = "right"
+                    elif event.key == pygame.K_n:
+                        shuffled_order, plan, plan_board, played = play_hint(
+                            shuffled_order, plan, plan_board, history, planner)
+                        hint_pending = not played
+                        last_voice_command = "hint" if played else "searching..."
+                    elif event.key == pygame.K_s:
+                        auto_solving = not auto_solving
+                    elif event.key in DIFFICULTY_KEYS:
+                        difficulty = DIFFICULTY_KEYS[event.key]
+                        shuffled_order = generate_shuffled_order(difficulty)
+                        history = []
+                        recognition_pool.new_generation()
+                        planner.stop()
+                        hint_pending = False
+                        auto_solving = False
+                        if state_table is None:
+                            # Only the 3x3 state table grades boards by distance.
+                            if GRID_SIZE == 3:
+                                last_voice_command = "state table still building, shuffled at random"
+                            else:
+                                last_voice_command = "difficulty only applies to 3x3, shuffled at random"
+                    elif event.key == pygame.K_c and mic_active and calibration.wait(0):
+                        recalibrate()
+                        listen_when_ready = True
+                        last_voice_command = "calibrating"
+                    elif event.key == pygame.K_u:
+                        shuffled_order = undo_batch(shuffled_order, history)
+                        last_voice_command = "undo"
+                    elif not mic_active and event.key in KEY_DIRECTIONS:
+                        direction = KEY_DIRECTIONS[event.key]
+                        shuffled_order, applied = apply_batch(shuffled_order, [direction])
+                        if applied:
+                            history.append(applied)
+                        last_voice_command = direction
 
         try:
             if mic_active:
@@ -253,20 +478,63 @@ def main():
                 if inp:
                     voice_command = normalize_answer(inp)
                     last_voice_command = voice_command
-                    if "بالا" in voice_command:
-                        shuffled_order = move_empty(shuffled_order, "up")
-                    elif "پایین" in voice_command:
-                        shuffled_order = move_empty(shuffled_order, "down")
-                    elif "چپ" in voice_command:
-                        shuffled_order = move_empty(shuffled_order, "left")
-                    elif "راست" in voice_command:
-                        shuffled_order = move_empty(shuffled_order, "right")
+                    kind, moves = parse_command(voice_command)
+                    if kind == "hint":
+                        shuffled_order, plan, plan_board, played = play_hint(
+                            shuffled_order, plan, plan_board, history, planner)
+                        hint_pending = not played
+                        if not played:
+                            last_voice_command = "searching..."
+                    elif kind == "solve":
+                        auto_solving = True
+                    elif kind == "undo":
+                        shuffled_order = undo_batch(shuffled_order, history)
+                    elif kind == "moves":
+                        shuffled_order, applied = apply_batch(shuffled_order, moves)
+                        if applied:
+                            history.append(applied)
         except queue.Empty:
             pass
+
+        if listen_when_ready and calibration.wait(0):
+            listen_when_ready = False
+            if mic_active and not game_won and stop_listening is None:
+                start_listening()
+
+        found = planner.poll()
+        if found:
+            board, moves, weight = found
+            if board != tuple(shuffled_order):
+                hint_pending = False
+            elif moves is None:
+                # Out of budget: say so rather than play a guess.
+                last_voice_command = "no solution found in time"
+                hint_pending = False
+                auto_solving = False
+            else:
+                plan, plan_board = moves, board
+                if hint_pending:
+                    shuffled_order, plan, plan_board, _ = play_hint(
+                        shuffled_order, plan, plan_board, history, planner)
+                    last_voice_command = "hint" if weight == 1 else "near-optimal hint"
+                    hint_pending = False
+
+        if auto_solving and not game_won and planner.searching is None:
+            now = pygame.time.get_ticks()
+            if now - last_auto_move >= AUTO_SOLVE_DELAY:
+                shuffled_order, plan, plan_board, played = play_hint(
+                    shuffled_order, plan, plan_board, history, planner)
+                last_auto_move = now
+                if not played:
+                    last_voice_command = "searching..."
         
         if not game_won and is_solved(shuffled_order):
             game_won = True
-            stop_listening(wait_for_stop=False)
+            planner.stop()
+            hint_pending = False
+            auto_solving = False
+            listen_when_ready = False
+            stop_mic()
             pygame.mixer.music.load(WIN_MUSIC_PATH)
             pygame.mixer.music.play() 
 
@@ -292,6 +560,10 @@ def main():
         rendered = font.render(bidi_text, True,(0, 0, 0))
         screen.blit(rendered, (10, HEADER_HEIGHT - 50))
 
+        remaining = moves_remaining(shuffled_order)
+        status = difficulty if remaining is None else f"{difficulty} - moves left: {remaining}"
+        screen.blit(small_font.render(status, True, (90, 90, 90)), (10, 5))
+
 
         if game_won:
             draw_win(screen,win_image)
@@ -299,6 +571,11 @@ def main():
 
         pygame.display.flip()
 
+    tile_cache.close()
+    planner.stop()
+    recognition_pool.close()
+    calibration.remember()
+    print("Recognition:", recognition_pool.stats())
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 from PIL import Image
+import argparse
+import hashlib
+import json
 import os
+import time
+from multiprocessing import Pool
 
-def split_image(image_path, output_folder, grid_size=(3, 3)):
-    img = Image.open(image_path)
+def split_image(image_path, output_folder, grid_size=(3, 3), atlas=False):
+    img = Image.open(image_path) if isinstance(image_path, str) else image_path
     width, height = img.size
     tile_width = width // grid_size[0]
     tile_height = height // grid_size[1]
@@ -29,6 +34,13 @@ def split_image(image_path, output_folder, grid_size=(3, 3)):
                 tiles.append(crop)
             index += 1
 
+    if atlas:
+        sheet = Image.new("RGB", (tile_width * grid_size[0], tile_height * grid_size[1]))
+        for i, tile in enumerate(tiles):
+            row, col = divmod(i, grid_size[0])
+            sheet.paste(tile, (col * tile_width, row * tile_height))
+        sheet.save(f"{output_folder}/atlas.png")
+
     print(f"{index} tile(s) saved in '{output_folder}'")
     return tiles
 
@@ -36,12 +48,131 @@ def split_image(image_path, output_folder, grid_size=(3, 3)):
 base_dir = os.path.dirname(os.path.abspath(__file__))
 IMAGES_DIR = base_dir + "/images"
 OUTPUT_DIR = base_dir + "/tiles"
+MANIFEST_FILE = OUTPUT_DIR + "/manifest.json"
 GRID_SIZE = (3, 3)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+SAVE_INTERVAL = 5.0
+
+
+def output_folder(image_name, grid, output_dir=OUTPUT_DIR):
+    # 3x3 keeps the original tiles/<name> layout the game already reads.
+    if grid == GRID_SIZE[0]:
+        return os.path.join(output_dir, image_name)
+    return os.path.join(output_dir, f"{image_name}_{grid}x{grid}")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def cut_grids(entry, digest, image_name, output_dir):
+    # Grid sizes already cut from this exact picture, and still on disk.
+    if not entry or entry["sha256"] != digest:
+        return []
+    return [grid for grid in entry["grids"]
+            if os.path.exists(os.path.join(output_folder(image_name, grid, output_dir), f"tile_{grid * grid - 1}.png"))]
+
+
+def split_job(image_path, grids, output_dir, atlas, known):
+    # Runs in a worker. `known` is the manifest entry from the last run; when
+    # the file still hashes the same only the grids missing on disk are cut.
+    filename = os.path.basename(image_path)
+    try:
+        digest = file_hash(image_path)
+        image_name = os.path.splitext(filename)[0]
+        done = cut_grids(known, digest, image_name, output_dir)
+        atlases = [grid for grid in done if grid in known["atlas"]] if done else []
+        todo = [grid for grid in grids if grid not in done or (atlas and grid not in atlases)]
+        if todo:
+            # Decode the source once and cut it for every requested grid size.
+            with Image.open(image_path) as img:
+                img = img.convert("RGB")
+                for grid in todo:
+                    split_image(img, output_folder(image_name, grid, output_dir), (grid, grid), atlas)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return filename, None, str(e)
+    return filename, {"sha256": digest, "grids": sorted(set(done) | set(todo)),
+                      "atlas": sorted(set(atlases) | set(todo if atlas else []))}, None
+
+
+def run_job(job):
+    return split_job(*job)
+
+
+def split_all(images_dir=IMAGES_DIR, output_dir=OUTPUT_DIR, grids=(3,), atlas=False, workers=None, force=False):
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    manifest = {} if force else load_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    stats = {}
+    skipped = 0
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image_path = os.path.join(images_dir, filename)
+        st = os.stat(image_path)
+        stats[filename] = (st.st_size, st.st_mtime_ns)
+        entry = manifest.get(filename)
+        # Unchanged size and mtime: trust the stored hash instead of reading the file.
+        if entry and (entry.get("size"), entry.get("mtime_ns")) == stats[filename]:
+            done = cut_grids(entry, entry["sha256"], os.path.splitext(filename)[0], output_dir)
+            if all(grid in done and (not atlas or grid in entry["atlas"]) for grid in grids):
+                skipped += 1
+                continue
+        jobs.append((image_path, grids, output_dir, atlas, entry))
+
+    failed = 0
+    if jobs:
+        # Results are written into the manifest as they arrive, and it is saved
+        # every few seconds and on the way out, so an interrupted run or a bad
+        # file only costs the pictures still in flight.
+        last_save = time.monotonic()
+        try:
+            with Pool(workers) as pool:
+                for filename, entry, error in pool.imap_unordered(run_job, jobs):
+                    if error:
+                        failed += 1
+                        print(f"Could not split {filename}: {error}")
+                        continue
+                    size, mtime_ns = stats[filename]
+                    manifest[filename] = dict(entry, size=size, mtime_ns=mtime_ns)
+                    if time.monotonic() - last_save > SAVE_INTERVAL:
+                        save_manifest(manifest, manifest_path)
+                        last_save = time.monotonic()
+        finally:
+            save_manifest(manifest, manifest_path)
+    return len(jobs) - failed, skipped, failed
+
 
 if __name__ == "__main__":
-    for filename in os.listdir(IMAGES_DIR):
-        if filename.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")):
-            image_path = os.path.join(IMAGES_DIR, filename)
-            image_name = os.path.splitext(filename)[0]
-            output_path = os.path.join(OUTPUT_DIR, image_name)
-            split_image(image_path, output_path, grid_size=GRID_SIZE)
+    parser = argparse.ArgumentParser(description="Cut the pictures in images/ into puzzle tiles.")
+    parser.add_argument("--grids", type=int, nargs="+", default=[GRID_SIZE[0]], help="board sizes to cut, e.g. 3 4 5")
+    parser.add_argument("--atlas", action="store_true", help="also write one atlas.png sheet per board")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and redo every picture")
+    parser.add_argument("--images", default=IMAGES_DIR)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done, skipped, failed = split_all(args.images, args.output, args.grids, args.atlas, args.workers, args.force)
+    print(f"split {done} picture(s), {skipped} unchanged, {failed} failed, in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,336 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+import numpy as np
+from solver import Solver, SearchBudgetExceeded, DIRECTIONS, get_board, is_solvable
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Disjoint tile groups per board size, with the empty cell last in the goal
+# (tile t belongs at cell t). The bigger groups give better estimates but
+# grow as cells! / (cells - k)! entries each.
+PARTITIONS = {
+    3: {"4-4": [[0, 1, 3, 4], [2, 5, 6, 7]]},
+    4: {
+        "6-6-3": [[2, 5, 6, 9, 10, 14], [0, 1, 3, 4, 7, 8], [11, 12, 13]],
+        "7-8": [[0, 1, 2, 3, 4, 5, 6, 7], [8, 9, 10, 11, 12, 13, 14]],
+    },
+    5: {
+        "5-5-5-5-4": [[0, 1, 2, 5, 6], [3, 4, 8, 9, 14], [10, 11, 15, 16, 20],
+                      [12, 13, 17, 18, 19], [7, 21, 22, 23]],
+        "6-6-6-6": [[0, 1, 2, 5, 6, 7], [3, 4, 8, 9, 13, 14],
+                    [10, 11, 15, 16, 20, 21], [12, 17, 18, 19, 22, 23]],
+    },
+}
+# 7-8 is the stronger 4x4 split, but its 8-tile group has 16! / 8! entries,
+# about 3.9 GiB of costs while building, which does not fit next to the game.
+# With 6-6-3 an optimal search misses the hint budget on many uniformly
+# shuffled boards, so the game falls back to a weighted search for those.
+DEFAULT_PARTITION = {3: "4-4", 4: "6-6-3", 5: "5-5-5-5-4"}
+
+MAGIC = b"P8PD"
+HEADER = struct.Struct("<4sBB")
+GROUP = struct.Struct("<QQ")
+MAX_STORED = 15
+CHUNK = 1 << 18
+
+
+def table_path(size, partition):
+    return os.path.join(base_dir, f"pdb_{size}x{size}_{partition}.bin")
+
+
+def group_weights(cells, k):
+    # Mixed-radix weights for ranking k distinct cells out of `cells`.
+    weights = []
+    for i in range(k):
+        weight = 1
+        for j in range(i + 1, k):
+            weight *= cells - j
+        weights.append(weight)
+    return weights
+
+
+def group_entries(cells, k):
+    entries = 1
+    for i in range(k):
+        entries *= cells - i
+    return entries
+
+
+def rank_array(positions, weights):
+    index = np.zeros(len(positions), np.int64)
+    for i in range(positions.shape[1]):
+        digit = positions[:, i].astype(np.int64)
+        for j in range(i):
+            digit -= positions[:, j] < positions[:, i]
+        index += digit * weights[i]
+    return index
+
+
+def unrank_array(index, cells, weights):
+    k = len(weights)
+    positions = np.empty((len(index), k), np.int8)
+    free = np.ones((len(index), cells), bool)
+    rows = np.arange(len(index))
+    for i in range(k):
+        digit, index = np.divmod(index, weights[i])
+        # The digit-th cell not yet taken by an earlier tile.
+        positions[:, i] = np.argmax(np.cumsum(free, axis=1) > digit[:, None], axis=1)
+        free[rows, positions[:, i]] = False
+    return positions
+
+
+def expand(states, cells, weights, neighbours, k, into_group):
+    # Moves of the empty cell (stored after the group's tiles) from each state:
+    # into a free cell when into_group is False, or swapping with a group tile.
+    positions = unrank_array(states, cells, weights)
+    owner = np.full((len(positions), cells), -1, np.int8)
+    rows = np.arange(len(positions))
+    owner[rows[:, None], positions[:, :k]] = np.arange(k, dtype=np.int8)
+    blank = positions[:, k]
+    results = []
+    for d in range(neighbours.shape[1]):
+        target = neighbours[blank, d]
+        legal = target >= 0
+        tile = np.full(len(positions), -1, np.int8)
+        tile[legal] = owner[rows[legal], target[legal]]
+        legal &= (tile >= 0) if into_group else (tile < 0)
+        if not legal.any():
+            continue
+        moved = positions[legal]
+        moved[:, k] = target[legal]
+        if into_group:
+            moved[np.arange(len(moved)), tile[legal]] = blank[legal]
+        results.append(rank_array(moved, weights))
+    return np.concatenate(results) if results else np.zeros(0, np.int64)
+
+
+def build_group(size, tiles):
+    # Uniform-cost search from the goal over the group's tiles plus the empty
+    # cell, where only moves of group tiles cost anything. Every real move moves
+    # one tile, so the groups' costs add up to an admissible estimate. The cost
+    # is then minimised over where the empty cell is. Each costed move changes a
+    # tile's Manhattan distance by one, so cost minus the group's Manhattan
+    # distance is even; half of it, capped at 15, is what gets stored.
+    cells = size * size
+    k = len(tiles)
+    weights = group_weights(cells, k + 1)
+    board = get_board(size)
+    distance = np.array([[board.distance[tile][pos] for pos in range(cells)] for tile in tiles], np.int16)
+
+    neighbours = np.full((cells, len(DIRECTIONS)), -1, np.int8)
+    for pos in range(cells):
+        for d, (_, target) in enumerate(board.neighbours[pos]):
+            neighbours[pos, d] = target
+
+    costs = np.full(group_entries(cells, k + 1), 0xFF, np.uint8)
+    frontier = rank_array(np.array([tiles + [board.blank]], np.int8), weights)
+    costs[frontier] = 0
+    cost = 0
+    while len(frontier):
+        layer = [frontier]
+        while len(frontier):
+            found = []
+            for start in range(0, len(frontier), CHUNK):
+                index = expand(frontier[start:start + CHUNK], cells, weights, neighbours, k, False)
+                index = np.unique(index[costs[index] == 0xFF])
+                costs[index] = cost
+                found.append(index)
+            frontier = np.concatenate(found)
+            layer.append(frontier)
+
+        cost += 1
+        found = []
+        for states in layer:
+            for start in range(0, len(states), CHUNK):
+                index = expand(states[start:start + CHUNK], cells, weights, neighbours, k, True)
+                index = np.unique(index[costs[index] == 0xFF])
+                costs[index] = cost
+                found.append(index)
+        frontier = np.concatenate(found) if found else np.zeros(0, np.int64)
+
+    costs = costs.reshape(-1, cells - k).min(axis=1)
+    group = group_weights(cells, k)
+    values = np.empty(len(costs), np.uint8)
+    for start in range(0, len(costs), CHUNK):
+        index = np.arange(start, min(start + CHUNK, len(costs)))
+        manhattan = distance[np.arange(k), unrank_array(index, cells, group)].sum(axis=1)
+        values[index] = np.minimum((costs[index] - manhattan) // 2, MAX_STORED)
+    return values
+
+
+def pack_nibbles(values):
+    if len(values) % 2:
+        values = np.append(values, np.uint8(0))
+    return values[0::2] | (values[1::2] << 4)
+
+
+def build_database(size, partition, path=None, verbose=True):
+    path = path or table_path(size, partition)
+    groups = PARTITIONS[size][partition]
+    packed = []
+    for tiles in groups:
+        start = time.perf_counter()
+        values = build_group(size, tiles)
+        packed.append(pack_nibbles(values))
+        if verbose:
+            print(f"group {tiles}: {len(values)} entries, {time.perf_counter() - start:.1f}s")
+
+    offset = HEADER.size + len(groups) * (1 + GROUP.size) + sum(len(tiles) for tiles in groups)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, len(groups)))
+        for tiles, table in zip(groups, packed):
+            f.write(bytes([len(tiles)] + tiles))
+            f.write(GROUP.pack(offset, len(table)))
+            offset += len(table)
+        for table in packed:
+            f.write(table.tobytes())
+    return path
+
+
+class PatternDatabase:
+    # Read-only mmap of a built database, so every game process shares the same
+    # pages. Called with a packed board it returns an admissible estimate.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pattern database")
+        self.board = get_board(self.size)
+        self.shifts = [self.board.bits * pos for pos in range(self.board.cells)]
+        self.groups = []
+        pos = HEADER.size
+        for _ in range(count):
+            k = self.map[pos]
+            tiles = list(self.map[pos + 1:pos + 1 + k])
+            offset, _ = GROUP.unpack_from(self.map, pos + 1 + k)
+            self.groups.append((tiles, group_weights(self.size * self.size, k), offset))
+            pos += 1 + k + GROUP.size
+
+    def __call__(self, state):
+        board = self.board
+        mask = board.mask
+        where = [0] * board.cells
+        for pos, shift in enumerate(self.shifts):
+            where[(state >> shift) & mask] = pos
+        table = self.map
+        distance = board.distance
+        estimate = 0
+        for tiles, weights, offset in self.groups:
+            index = 0
+            seen = []
+            for tile, weight in zip(tiles, weights):
+                pos = where[tile]
+                estimate += distance[tile][pos]
+                digit = pos
+                for earlier in seen:
+                    if earlier < pos:
+                        digit -= 1
+                seen.append(pos)
+                index += digit * weight
+            estimate += ((table[offset + (index >> 1)] >> ((index & 1) << 2)) & 0xF) << 1
+        return estimate
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def load_pattern_db(size, partition=None):
+    path = table_path(size, partition or DEFAULT_PARTITION.get(size, ""))
+    if not os.path.exists(path):
+        return None
+    return PatternDatabase(path)
+
+
+def random_walk(size, steps, rng):
+    board = get_board(size)
+    order = list(range(size * size))
+    blank = board.blank
+    previous = None
+    for _ in range(steps):
+        options = [target for _, target in board.neighbours[blank] if target != previous]
+        target = rng.choice(options)
+        order[blank], order[target] = order[target], order[blank]
+        previous, blank = blank, target
+    return order
+
+
+def random_board(size, rng):
+    # Uniform over the solvable boards, which is far harder than a short walk.
+    order = list(range(size * size))
+    while True:
+        rng.shuffle(order)
+        if is_solvable(order, size) and order != sorted(order):
+            return list(order)
+
+
+def cmd_build(args):
+    start = time.perf_counter()
+    path = build_database(args.size, args.partition)
+    print(f"built {path} in {time.perf_counter() - start:.1f}s, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+
+def cmd_bench(args):
+    path = table_path(args.size, args.partition)
+    if not os.path.exists(path):
+        cmd_build(args)
+    database = PatternDatabase(path)
+    print(f"{path}: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    rng = random.Random(args.seed)
+    if args.walk:
+        boards = [random_walk(args.size, args.walk, rng) for _ in range(args.boards)]
+    else:
+        boards = [random_board(args.size, rng) for _ in range(args.boards)]
+    for name, heuristic in (("linear conflicts", None), ("pattern database", database)):
+        times, nodes, failed, lengths = [], 0, 0, []
+        for order in boards:
+            solver = Solver(args.size, args.max_nodes, args.time_limit, heuristic=heuristic, weight=args.weight)
+            try:
+                lengths.append(len(solver.solve(order)))
+            except SearchBudgetExceeded:
+                failed += 1
+            times.append(solver.elapsed)
+            nodes += solver.nodes
+        times.sort()
+        moves = f"{min(lengths)}-{max(lengths)}" if lengths else "-"
+        print(f"{name:17} median {times[len(times) // 2] * 1000:8.1f} ms  max {times[-1] * 1000:8.1f} ms  "
+              f"nodes {nodes:>9}  moves {moves:>7}  over budget {failed}/{len(boards)}")
+
+    state = get_board(args.size).pack(boards[0])
+    start = time.perf_counter()
+    for _ in range(10000):
+        database(state)
+    print(f"lookup: {(time.perf_counter() - start) * 100:.2f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and benchmark additive pattern databases.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, func in (("build", cmd_build), ("bench", cmd_bench)):
+        command = sub.add_parser(name)
+        command.add_argument("size", type=int, choices=sorted(PARTITIONS))
+        command.add_argument("--partition", default=None)
+        command.set_defaults(func=func)
+        if name == "bench":
+            command.add_argument("--boards", type=int, default=20)
+            command.add_argument("--walk", type=int, default=None,
+                                 help="random moves from the goal instead of a uniformly shuffled board")
+            command.add_argument("--weight", type=float, default=1, help="above 1 trades optimal length for speed")
+            command.add_argument("--seed", type=int, default=0)
+            command.add_argument("--max-nodes", type=int, default=2_000_000)
+            command.add_argument("--time-limit", type=float, default=10.0)
+    args = parser.parse_args()
+    args.partition = args.partition or DEFAULT_PARTITION[args.size]
+    if args.partition not in PARTITIONS[args.size]:
+        parser.error(f"partitions for {args.size}x{args.size}: {', '.join(PARTITIONS[args.size])}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import math
+import time
+
+# Directions move the empty cell, matching move_empty in game.py.
+DIRECTIONS = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+class Board:
+    # Lookup tables for one N x N size. A board is packed into one int with
+    # `bits` bits per cell holding the tile at that cell; the last tile is empty.
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.blank = self.cells - 1
+        self.bits = max(4, (self.cells - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.line_mask = (1 << (self.bits * size)) - 1
+
+        self.neighbours = []
+        for pos in range(self.cells):
+            row, col = divmod(pos, size)
+            links = []
+            for direction, (dr, dc) in DIRECTIONS.items():
+                r, c = row + dr, col + dc
+                if 0 <= r < size and 0 <= c < size:
+                    links.append((direction, r * size + c))
+            self.neighbours.append(links)
+
+        self.distance = [[0] * self.cells for _ in range(self.cells)]
+        for tile in range(self.cells - 1):
+            for pos in range(self.cells):
+                self.distance[tile][pos] = (abs(tile // size - pos // size)
+                                            + abs(tile % size - pos % size))
+
+        self.row_cache = [{} for _ in range(size)]
+        self.col_cache = [{} for _ in range(size)]
+
+    def pack(self, order):
+        state = 0
+        for pos, tile in enumerate(order):
+            state |= tile << (self.bits * pos)
+        return state
+
+    def tile_at(self, state, pos):
+        return (state >> (self.bits * pos)) & self.mask
+
+    def row_key(self, state, row):
+        return (state >> (self.bits * self.size * row)) & self.line_mask
+
+    def col_key(self, state, col):
+        key = 0
+        for row in range(self.size):
+            key |= self.tile_at(state, row * self.size + col) << (self.bits * row)
+        return key
+
+    def row_conflicts(self, state, row):
+        key = self.row_key(state, row)
+        cache = self.row_cache[row]
+        if key not in cache:
+            goals = [tile % self.size for tile in self.line_tiles(key)
+                     if tile != self.blank and tile // self.size == row]
+            cache[key] = 2 * (len(goals) - longest_increasing(goals))
+        return cache[key]
+
+    def col_conflicts(self, state, col):
+        key = self.col_key(state, col)
+        cache = self.col_cache[col]
+        if key not in cache:
+            goals = [tile // self.size for tile in self.line_tiles(key)
+                     if tile != self.blank and tile % self.size == col]
+            cache[key] = 2 * (len(goals) - longest_increasing(goals))
+        return cache[key]
+
+    def line_tiles(self, key):
+        return [(key >> (self.bits * i)) & self.mask for i in range(self.size)]
+
+    def manhattan(self, state):
+        return sum(self.distance[self.tile_at(state, pos)][pos] for pos in range(self.cells))
+
+    def heuristic(self, state):
+        return (self.manhattan(state)
+                + sum(self.row_conflicts(state, i) for i in range(self.size))
+                + sum(self.col_conflicts(state, i) for i in range(self.size)))
+
+    def swap(self, state, blank, target):
+        tile = self.tile_at(state, target)
+        delta = tile ^ self.blank
+        return state ^ (delta << (self.bits * target)) ^ (delta << (self.bits * blank)), tile
+
+
+def longest_increasing(values):
+    tails = []
+    for value in values:
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(tails):
+            tails.append(value)
+        else:
+            tails[lo] = value
+    return len(tails)
+
+
+boards = {}
+
+
+def get_board(size):
+    if size not in boards:
+        boards[size] = Board(size)
+    return boards[size]
+
+
+def is_solvable(order, size):
+    blank = size * size - 1
+    tiles = [tile for tile in order if tile != blank]
+    inversions = sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+    if size % 2 == 1:
+        return inversions % 2 == 0
+    blank_row = order.index(blank) // size
+    return (inversions + blank_row) % 2 == (size - 1) % 2
+
+
+class Solver:
+    # IDA* with Manhattan distance plus linear conflicts, both updated
+    # incrementally: a move changes one tile's distance and two rows or columns.
+    # A weight above 1 inflates the estimate: solutions are no longer optimal,
+    # at most `weight` times longer, but found with far fewer nodes.
+    def __init__(self, size, max_nodes=None, time_limit=None, heuristic=None, cancel=None, weight=1):
+        self.board = get_board(size)
+        self.cancel = cancel
+        self.weight = weight
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.extra_heuristic = heuristic
+        self.nodes = 0
+        self.elapsed = 0.0
+
+    def solve(self, order):
+        board = self.board
+        if not is_solvable(order, board.size):
+            return None
+
+        self.nodes = 0
+        self.started = time.perf_counter()
+        state = board.pack(order)
+        blank = order.index(board.blank)
+        manhattan = board.manhattan(state)
+        conflicts = board.heuristic(state) - manhattan
+        bound = self.weight * self.estimate(state, manhattan + conflicts)
+        path = []
+        try:
+            while True:
+                found = self.search(state, blank, 0, bound, manhattan, conflicts, None, path)
+                if found is True:
+                    return path
+                bound = found
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+
+    def estimate(self, state, h):
+        if self.extra_heuristic is None:
+            return h
+        return max(h, self.extra_heuristic(state))
+
+    def search(self, state, blank, g, bound, manhattan, conflicts, previous, path):
+        board = self.board
+        # The extra heuristic is only consulted when the cheap one cannot prune.
+        f = g + self.weight * (manhattan + conflicts)
+        if f > bound:
+            return f
+        if self.extra_heuristic is not None:
+            f = g + self.weight * self.extra_heuristic(state)
+            if f > bound:
+                return f
+        if manhattan == 0:
+            return True
+
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchBudgetExceeded(f"node budget of {self.max_nodes} exceeded")
+        if self.nodes % 4096 == 0:
+            if self.time_limit is not None and time.perf_counter() - self.started > self.time_limit:
+                raise SearchBudgetExceeded(f"time budget of {self.time_limit}s exceeded")
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchBudgetExceeded("search cancelled")
+
+        size = board.size
+        minimum = math.inf
+        for direction, target in board.neighbours[blank]:
+            if direction == previous:
+                continue
+            child, tile = board.swap(state, blank, target)
+            child_manhattan = manhattan - board.distance[tile][target] + board.distance[tile][blank]
+            if direction in ("up", "down"):
+                lines = board.row_conflicts, blank // size, target // size
+            else:
+                lines = board.col_conflicts, blank % size, target % size
+            line_conflicts, a, b = lines
+            child_conflicts = (conflicts - line_conflicts(state, a) - line_conflicts(state, b)
+                               + line_conflicts(child, a) + line_conflicts(child, b))
+
+            path.append(direction)
+            found = self.search(child, target, g + 1, bound, child_manhattan, child_conflicts,
+                                OPPOSITE[direction], path)
+            if found is True:
+                return True
+            path.pop()
+            minimum = min(minimum, found)
+        return minimum
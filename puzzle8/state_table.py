@@ -0,0 +1,176 @@
+import mmap
+import os
+import random
+import struct
+from collections import deque
+from math import factorial
+from solver import DIRECTIONS
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+TABLE_FILE = os.path.join(base_dir, "state_table.bin")
+
+SIZE = 3
+CELLS = SIZE * SIZE
+BLANK = CELLS - 1
+# A solvable board is identified by where the empty cell is plus the rank of
+# the 8 tiles' permutation halved: the two permutations sharing rank // 2
+# differ by one swap, and only the even one is solvable.
+HALF_TILE_PERMS = factorial(CELLS - 1) // 2
+STATES = CELLS * HALF_TILE_PERMS
+MAGIC = b"P8ST"
+HEADER = struct.Struct("<4sI")
+UNREACHABLE = 0xFF
+CHUNK = 4096
+
+FACTORIALS = [factorial(i) for i in range(CELLS)]
+NEIGHBOURS = []
+for pos in range(CELLS):
+    row, col = divmod(pos, SIZE)
+    NEIGHBOURS.append([(direction, (row + dr) * SIZE + col + dc)
+                       for direction, (dr, dc) in DIRECTIONS.items()
+                       if 0 <= row + dr < SIZE and 0 <= col + dc < SIZE])
+
+
+def rank_tiles(tiles):
+    rank = 0
+    n = len(tiles)
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if tiles[j] < tiles[i]:
+                smaller += 1
+        rank += smaller * FACTORIALS[n - 1 - i]
+    return rank
+
+
+def unrank_tiles(rank, n):
+    items = list(range(n))
+    tiles = []
+    for i in range(n - 1, -1, -1):
+        index, rank = divmod(rank, FACTORIALS[i])
+        tiles.append(items.pop(index))
+    return tiles
+
+
+def is_even(tiles):
+    inversions = 0
+    for i in range(len(tiles)):
+        for j in range(i + 1, len(tiles)):
+            if tiles[i] > tiles[j]:
+                inversions += 1
+    return inversions % 2 == 0
+
+
+def state_index(order):
+    blank = order.index(BLANK)
+    tiles = [tile for tile in order if tile != BLANK]
+    return blank * HALF_TILE_PERMS + rank_tiles(tiles) // 2
+
+
+def state_order(index):
+    blank, half = divmod(index, HALF_TILE_PERMS)
+    tiles = unrank_tiles(2 * half, CELLS - 1)
+    if not is_even(tiles):
+        tiles = unrank_tiles(2 * half + 1, CELLS - 1)
+    tiles.insert(blank, BLANK)
+    return tiles
+
+
+def build_table():
+    table = bytearray([UNREACHABLE]) * STATES
+    goal = list(range(CELLS))
+    table[state_index(goal)] = 0
+    queue = deque([(goal, BLANK)])
+    while queue:
+        order, blank = queue.popleft()
+        depth = table[state_index(order)] + 1
+        for _, target in NEIGHBOURS[blank]:
+            child = order[:]
+            child[blank], child[target] = child[target], child[blank]
+            index = state_index(child)
+            if table[index] == UNREACHABLE:
+                table[index] = depth
+                queue.append((child, target))
+    return table
+
+
+def save_table(table, path=TABLE_FILE):
+    # Written aside and renamed, so a game polling for the file never maps half of it.
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(table)))
+        f.write(table)
+    os.replace(tmp, path)
+
+
+class StateTable:
+    def __init__(self, path=TABLE_FILE):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or count != STATES:
+            raise ValueError(f"{path} is not a 3x3 state table")
+
+    def distance(self, order):
+        depth = self.map[HEADER.size + state_index(order)]
+        return None if depth == UNREACHABLE else depth
+
+    def next_move(self, order):
+        depth = self.distance(order)
+        if not depth:
+            return None
+        blank = order.index(BLANK)
+        for direction, target in NEIGHBOURS[blank]:
+            child = list(order)
+            child[blank], child[target] = child[target], child[blank]
+            if self.distance(child) == depth - 1:
+                return direction
+        return None
+
+    def random_order(self, depth, rng=random):
+        # Uniform over the boards at this depth: count them, pick a rank, then
+        # skip whole chunks by their counts to reach the board with that rank.
+        needle = bytes([depth])
+        data = self.map[HEADER.size:]
+        count = data.count(needle)
+        if not count:
+            raise ValueError(f"no 3x3 board is {depth} moves from solved")
+        rank = rng.randrange(count)
+        start = 0
+        while True:
+            in_chunk = data.count(needle, start, start + CHUNK)
+            if rank < in_chunk:
+                break
+            rank -= in_chunk
+            start += CHUNK
+        found = data.find(needle, start)
+        for _ in range(rank):
+            found = data.find(needle, found + 1)
+        return state_order(found)
+
+    def histogram(self):
+        counts = {}
+        for depth in self.map[HEADER.size:]:
+            counts[depth] = counts.get(depth, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def load_state_table(path=TABLE_FILE):
+    # None until the table has been built with `python state_table.py`.
+    if not os.path.exists(path):
+        return None
+    return StateTable(path)
+
+
+if __name__ == "__main__":
+    import time
+    start = time.perf_counter()
+    table = build_table()
+    save_table(table)
+    print(f"built {STATES} states in {time.perf_counter() - start:.1f}s -> {TABLE_FILE}")
+    for depth, count in StateTable().histogram().items():
+        print(f"{depth:>3} {count:>7}")
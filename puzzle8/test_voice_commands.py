@@ -0,0 +1,29 @@
+import pytest
+from voice_commands import parse_command
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("بالا", ("moves", ["up"])),
+    ("پائین", ("moves", ["down"])),
+    ("دو بار بالا", ("moves", ["up", "up"])),
+    ("دو تا بالا چپ", ("moves", ["up", "up", "left"])),
+    ("بالا دو بار", ("moves", ["up", "up"])),
+    ("۳ تا چپ", ("moves", ["left"] * 3)),
+    ("two times up", ("moves", ["up", "up"])),
+    ("20 بار راست", ("moves", ["right"] * 9)),
+    # "نه" is "no" unless a count marker follows it.
+    ("نه بالا", ("moves", ["up"])),
+    ("نه، بالا", ("moves", ["up"])),
+    ("بالا نه", ("moves", ["up"])),
+    ("نه بار بالا", ("moves", ["up"] * 9)),
+    ("نه تا چپ", ("moves", ["left"] * 9)),
+    ("راهنما", ("hint", [])),
+    ("برگرد", ("undo", [])),
+    ("solve", ("solve", [])),
+    ("بالا راهنما", ("moves", ["up"])),
+    ("نه", (None, [])),
+    ("سلام", (None, [])),
+    ("", (None, [])),
+])
+def test_parse_command(text, expected):
+    assert parse_command(text) == expected
@@ -0,0 +1,117 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+import pygame
+
+
+class TileAtlasCache:
+    # Each picture is decoded once into a single atlas surface and the tiles
+    # handed out are subsurfaces of it. Up to `capacity` atlases stay in an LRU.
+    # A worker thread decodes prefetched pictures ahead of time, so taking one
+    # later only costs a convert() on the main thread.
+    def __init__(self, grid_size, tile_size, capacity=4):
+        self.grid_size = grid_size
+        self.tile_size = tile_size
+        self.capacity = capacity
+        self.atlases = OrderedDict()
+        self.decoded = {}
+        self.pending = set()
+        self.cond = threading.Condition()
+        self.requests = queue.Queue()
+        self.hits = 0
+        self.prefetched = 0
+        self.misses = 0
+        self.worker = threading.Thread(target=self.prefetch_loop, daemon=True)
+        self.worker.start()
+
+    def decode(self, source):
+        # A source is either a picture, scaled once to the board size with the
+        # last cell painted white as the empty tile, or a folder of pre-split
+        # tile_{i}.png files, read from its atlas.png sheet when there is one.
+        size = self.tile_size
+        board = self.grid_size * size
+        if os.path.isfile(source):
+            atlas = self.scale(pygame.image.load(source), board)
+            atlas.fill((255, 255, 255), (board - size, board - size, size, size))
+            return atlas
+
+        sheet = os.path.join(source, "atlas.png")
+        if os.path.exists(sheet):
+            return self.scale(pygame.image.load(sheet), board)
+
+        atlas = pygame.Surface((board, board))
+        for i in range(self.grid_size * self.grid_size):
+            image = pygame.image.load(os.path.join(source, f"tile_{i}.png"))
+            row, col = divmod(i, self.grid_size)
+            atlas.blit(pygame.transform.scale(image, (size, size)), (col * size, row * size))
+        return atlas
+
+    def scale(self, image, board):
+        # smoothscale only takes 24 and 32 bit surfaces.
+        if image.get_bitsize() < 24:
+            image = image.convert(24)
+        return pygame.transform.smoothscale(image, (board, board))
+
+    def slice(self, atlas):
+        size = self.tile_size
+        return [atlas.subsurface((col * size, row * size, size, size))
+                for row in range(self.grid_size) for col in range(self.grid_size)]
+
+    def get(self, source):
+        tiles = self.atlases.get(source)
+        if tiles is not None:
+            self.atlases.move_to_end(source)
+            self.hits += 1
+            return tiles
+
+        with self.cond:
+            while source in self.pending:
+                self.cond.wait()
+            atlas = self.decoded.pop(source, None)
+        if atlas is None:
+            self.misses += 1
+            atlas = self.decode(source)
+        else:
+            self.prefetched += 1
+
+        tiles = self.slice(atlas.convert())
+        self.atlases[source] = tiles
+        if len(self.atlases) > self.capacity:
+            self.atlases.popitem(last=False)
+        return tiles
+
+    def prefetch(self, source):
+        with self.cond:
+            if source in self.atlases or source in self.decoded or source in self.pending:
+                return
+            self.pending.add(source)
+        self.requests.put(source)
+
+    def prefetch_loop(self):
+        while True:
+            source = self.requests.get()
+            if source is None:
+                break
+            # Whatever happens, get() must stop waiting for this source; after a
+            # failure it decodes synchronously and the error surfaces there.
+            atlas = None
+            try:
+                atlas = self.decode(source)
+            except Exception as e:
+                print(f"Could not prefetch {source}: {e}")
+            finally:
+                with self.cond:
+                    self.pending.discard(source)
+                    if atlas is not None:
+                        self.decoded[source] = atlas
+                        while len(self.decoded) > self.capacity:
+                            self.decoded.pop(next(iter(self.decoded)))
+                    self.cond.notify_all()
+
+    def close(self):
+        self.requests.put(None)
+
+    def stats(self):
+        return {"hits": self.hits, "prefetched": self.prefetched, "misses": self.misses,
+                "cached": len(self.atlases)}
@@ -0,0 +1,68 @@
+import re
+
+# Words the recognizer returns for each command, Persian first, then English.
+DIRECTION_WORDS = {
+    "بالا": "up", "پایین": "down", "پائین": "down", "چپ": "left", "راست": "right",
+    "up": "up", "down": "down", "left": "left", "right": "right",
+}
+COMMAND_WORDS = {
+    "راهنما": "hint", "حل": "solve", "برگرد": "undo", "برگردون": "undo",
+    "hint": "hint", "solve": "solve", "undo": "undo", "back": "undo",
+}
+COUNT_WORDS = {
+    "یک": 1, "یه": 1, "دو": 2, "سه": 3, "چهار": 4, "پنج": 5,
+    "شش": 6, "شیش": 6, "هفت": 7, "هشت": 8, "نه": 9,
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9,
+}
+# "دو بار بالا", "دو تا بالا", "two times up": words between a count and its direction.
+FILLER_WORDS = {"بار", "تا", "دفعه", "خونه", "و", "times", "time", "and", "x"}
+# "نه" is also "no": it only counts as nine in "نه بار" / "نه تا", so "نه بالا"
+# (no, up) is a single move.
+COUNT_MARKERS = {"بار", "تا", "دفعه"}
+AMBIGUOUS_COUNTS = {"نه"}
+MAX_COUNT = 9
+VOCABULARY = sorted(set(DIRECTION_WORDS) | set(COMMAND_WORDS) | set(COUNT_WORDS) | FILLER_WORDS)
+
+PERSIAN_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+ARABIC_LETTERS = str.maketrans({"ي": "ی", "ى": "ی", "ك": "ک", "‌": " "})
+TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    text = text.lower().translate(PERSIAN_DIGITS).translate(ARABIC_LETTERS)
+    return TOKEN.findall(text)
+
+
+def parse_count(token):
+    if token.isdigit():
+        return int(token)
+    return COUNT_WORDS.get(token)
+
+
+def parse_command(text):
+    # Returns (kind, moves). kind is "hint", "solve" or "undo" when the phrase
+    # names one of those, "moves" with the directions to play in order, or None.
+    # A count applies to the direction after it ("دو بار بالا چپ" is up, up,
+    # left), or to the one before it when it comes last ("بالا دو بار").
+    moves = []
+    count = None
+    tokens = tokenize(text)
+    for i, token in enumerate(tokens):
+        if token in COMMAND_WORDS and not moves:
+            return COMMAND_WORDS[token], []
+        direction = DIRECTION_WORDS.get(token)
+        if direction:
+            moves.extend([direction] * min(count or 1, MAX_COUNT))
+            count = None
+            continue
+        number = parse_count(token)
+        if token in AMBIGUOUS_COUNTS and (i + 1 == len(tokens) or tokens[i + 1] not in COUNT_MARKERS):
+            number = None
+        if number is not None:
+            count = number
+        elif token not in FILLER_WORDS:
+            count = None
+    if count and moves:
+        moves.extend([moves[-1]] * (min(count, MAX_COUNT) - 1))
+    return ("moves", moves) if moves else (None, [])
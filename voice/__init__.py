@@ -0,0 +1,4 @@
+from voice.recognizers import GoogleRecognizer, VoskRecognizer, make_recognizer
+from voice.recognition_pool import RecognitionPool, RecognitionResult
+from voice.streaming import StreamingRecognizer, StreamEvent
+from voice.calibration import MicCalibration
@@ -0,0 +1,80 @@
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from voice.recognizers import BACKENDS, make_recognizer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(folder):
+    # Each recording is <name>.wav next to <name>.txt holding what was said.
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.wav"))):
+        transcript = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(transcript):
+            with open(transcript, encoding="utf-8") as f:
+                expected = f.read().strip().lower()
+        else:
+            expected = None
+        fixtures.append((path, expected))
+    return fixtures
+
+
+def run(backend, fixtures, language, keywords):
+    recognizer = make_recognizer(backend, keywords)
+    if recognizer.name != backend:
+        return None
+    latencies, correct, failed = [], 0, 0
+    for path, expected in fixtures:
+        start = time.perf_counter()
+        # Timed from reading the file, so decoding and resampling count too.
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        try:
+            text = recognizer.recognize(audio, language).strip().lower()
+        except (sr.UnknownValueError, sr.RequestError):
+            text = None
+            failed += 1
+        latencies.append(time.perf_counter() - start)
+        correct += expected is not None and text == expected
+    return latencies, correct, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare recognizer latency on recorded WAV files.")
+    parser.add_argument("fixtures", nargs="?", default=FIXTURES_DIR, help="folder of <name>.wav + <name>.txt")
+    parser.add_argument("--language", default="fa-IR")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--keywords", nargs="*", default=None,
+                        help="vocabulary for keyword spotting, defaults to the words in the transcripts")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error(f"no .wav files in {args.fixtures}")
+    keywords = args.keywords
+    if keywords is None:
+        keywords = sorted({word for _, expected in fixtures if expected for word in expected.split()})
+
+    print(f"{len(fixtures)} recordings, language {args.language}")
+    print(f"{'backend':8} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'correct':>8} {'failed':>7}")
+    for backend in args.backends:
+        result = run(backend, fixtures, args.language, keywords)
+        if result is None:
+            print(f"{backend:8} unavailable")
+            continue
+        latencies, correct, failed = result
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{backend:8} {statistics.median(latencies) * 1000:>10.1f} {p95 * 1000:>8.1f} "
+              f"{latencies[-1] * 1000:>8.1f} {correct:>5}/{len(fixtures):<2} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+import os
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CALIBRATION_FILE = os.path.join(BASE_DIR, "calibration.json")
+
+
+def device_name(microphone):
+    audio = microphone.pyaudio_module.PyAudio()
+    try:
+        if microphone.device_index is None:
+            info = audio.get_default_input_device_info()
+        else:
+            info = audio.get_device_info_by_index(microphone.device_index)
+        return info["name"]
+    except (OSError, IOError):
+        return "default"
+    finally:
+        audio.terminate()
+
+
+def load_calibrations(path=CALIBRATION_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class MicCalibration:
+    # Energy thresholds are measured once per input device and cached on disk,
+    # shared by both games. A cached value is applied at once; measuring only
+    # happens on a background thread when there is no cached value or when
+    # asked to. While listening, speech_recognition keeps nudging the threshold
+    # to the room, and remember() saves it when it has drifted by more than
+    # `drift` from the cached value.
+    def __init__(self, recognizer, microphone, path=CALIBRATION_FILE, duration=1.0, drift=0.3):
+        self.recognizer = recognizer
+        self.microphone = microphone
+        self.path = path
+        self.duration = duration
+        self.drift = drift
+        self.device = device_name(microphone)
+        self.threshold = None
+        self.ready = threading.Event()
+        self.thread = None
+
+    def start(self, force=False, stop_listening=None):
+        # stop_listening, if given, is called first on the worker thread, so a
+        # running listener can release the microphone without blocking the UI.
+        self.ready.clear()
+        cached = load_calibrations(self.path).get(self.device)
+        if cached and not force:
+            self.apply(cached["energy_threshold"])
+            self.ready.set()
+            return
+        self.thread = threading.Thread(target=self.calibrate, args=(stop_listening,), daemon=True)
+        self.thread.start()
+
+    def calibrate(self, stop_listening=None):
+        try:
+            if stop_listening is not None:
+                stop_listening(wait_for_stop=True)
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=self.duration)
+            self.threshold = self.recognizer.energy_threshold
+            self.save()
+            print(f"Calibrated {self.device}: energy threshold {self.threshold:.0f}")
+        finally:
+            self.ready.set()
+
+    def apply(self, threshold):
+        self.threshold = threshold
+        self.recognizer.energy_threshold = threshold
+
+    def wait(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def remember(self):
+        current = self.recognizer.energy_threshold
+        if self.threshold and abs(current - self.threshold) > self.drift * self.threshold:
+            self.threshold = current
+            self.save()
+
+    def save(self):
+        calibrations = load_calibrations(self.path)
+        calibrations[self.device] = {"energy_threshold": self.threshold, "calibrated_at": time.time()}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(calibrations, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+if __name__ == "__main__":
+    import speech_recognition as sr
+    device_index = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    calibration = MicCalibration(sr.Recognizer(), sr.Microphone(device_index=device_index))
+    print(f"Recalibrating {calibration.device}, keep quiet for a second...")
+    calibration.start(force=True)
+    calibration.wait()
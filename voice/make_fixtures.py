@@ -0,0 +1,71 @@
+import argparse
+import ctypes
+import os
+import wave
+import espeakng_loader
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# The puzzle8 direction and command words, a batched move, and the exit word
+# the riddle game listens for. (file name, what is said)
+PHRASES = [
+    ("up", "بالا"),
+    ("down", "پایین"),
+    ("left", "چپ"),
+    ("right", "راست"),
+    ("hint", "راهنما"),
+    ("undo", "برگرد"),
+    ("two_up", "دو بار بالا"),
+    ("exit", "خروج"),
+]
+
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+ESPEAK_CHARS_UTF8 = 1
+SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+
+
+class Speaker:
+    # espeak-ng, loaded from the espeakng-loader wheel, rendering to memory.
+    def __init__(self, voice="fa", rate=150):
+        self.lib = ctypes.CDLL(espeakng_loader.get_library_path())
+        self.sample_rate = self.lib.espeak_Initialize(
+            AUDIO_OUTPUT_SYNCHRONOUS, 0, espeakng_loader.get_data_path().encode(), 0)
+        if self.sample_rate <= 0:
+            raise RuntimeError("espeak-ng failed to initialize")
+        self.samples = []
+        self.callback = SYNTH_CALLBACK(self.collect)
+        self.lib.espeak_SetSynthCallback(self.callback)
+        self.lib.espeak_SetVoiceByName(voice.encode())
+        self.lib.espeak_SetParameter(1, rate, 0)
+
+    def collect(self, wav, count, events):
+        if count > 0:
+            self.samples.append(ctypes.string_at(wav, count * 2))
+        return 0
+
+    def say(self, text, path):
+        self.samples = []
+        data = text.encode("utf-8") + b"\0"
+        self.lib.espeak_Synth(data, len(data), 0, 0, 0, ESPEAK_CHARS_UTF8, None, None)
+        self.lib.espeak_Synchronize()
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(b"".join(self.samples))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthesize the WAV fixtures used by bench.py.")
+    parser.add_argument("--output", default=FIXTURES_DIR)
+    parser.add_argument("--voice", default="fa")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    speaker = Speaker(args.voice)
+    for name, text in PHRASES:
+        path = os.path.join(args.output, name + ".wav")
+        speaker.say(text, path)
+        with open(os.path.join(args.output, name + ".txt"), "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"{path}: {text}")
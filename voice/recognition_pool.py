@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+import speech_recognition as sr
+
+
+class RecognitionResult:
+    def __init__(self, seq, generation, text, error, latency, started_at):
+        self.seq = seq
+        self.generation = generation
+        self.text = text
+        self.error = error
+        self.latency = latency
+        self.started_at = started_at
+
+
+class RecognitionPool:
+    # Captured phrases are recognized on `workers` threads and handed back in
+    # the order they were heard. Each phrase is tagged with the generation that
+    # was current when it was captured; new_generation() (a new board or puzzle)
+    # makes everything older stale, and stale phrases are dropped before or
+    # after recognition. At most max_pending phrases wait, the oldest is dropped
+    # beyond that. on_ready, if given, is called from a worker whenever a result
+    # can be polled.
+    def __init__(self, backend, language, workers=2, max_pending=4, on_ready=None):
+        self.backend = backend
+        self.on_ready = on_ready
+        self.language = language
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.jobs = deque()
+        self.finished = {}
+        self.ready = deque()
+        self.next_seq = 0
+        self.release_seq = 0
+        self.generation = 0
+        self.in_flight = 0
+        self.closed = False
+        self.completed = 0
+        self.dropped_full = 0
+        self.dropped_stale = 0
+        self.total_latency = 0.0
+        self.threads = [threading.Thread(target=self.worker_loop, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, audio):
+        # Called from the listening thread for every captured phrase.
+        with self.cond:
+            seq = self.next_seq
+            self.next_seq += 1
+            heard_at = time.perf_counter()
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            self.jobs.append((seq, self.generation, heard_at, heard_at - duration, audio))
+            if len(self.jobs) > self.max_pending:
+                dropped = self.jobs.popleft()
+                self.dropped_full += 1
+                self.finish(dropped[0], None)
+            self.cond.notify()
+
+    def new_generation(self):
+        with self.cond:
+            self.generation += 1
+            while self.jobs and self.jobs[0][1] != self.generation:
+                self.dropped_stale += 1
+                self.finish(self.jobs.popleft()[0], None)
+
+    def worker_loop(self):
+        while True:
+            with self.cond:
+                while not self.jobs and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                seq, generation, heard_at, started_at, audio = self.jobs.popleft()
+                language = self.language
+                self.in_flight += 1
+
+            text, error = None, None
+            try:
+                text = self.backend.recognize(audio, language).lower().strip()
+            except sr.UnknownValueError:
+                error = "unknown_value"
+            except sr.RequestError:
+                error = "request"
+            except Exception as e:
+                print("Unknown error:", e)
+                error = "other"
+            latency = time.perf_counter() - heard_at
+
+            with self.cond:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_latency += latency
+                self.finish(seq, RecognitionResult(seq, generation, text, error, latency, started_at))
+
+    def finish(self, seq, result):
+        # Results are released strictly by sequence number; a dropped phrase
+        # leaves a None so later ones are not held back by it.
+        self.finished[seq] = result
+        while self.release_seq in self.finished:
+            result = self.finished.pop(self.release_seq)
+            self.release_seq += 1
+            if result is not None:
+                self.ready.append(result)
+                if self.on_ready is not None:
+                    self.on_ready()
+
+    def poll(self):
+        with self.cond:
+            while self.ready:
+                result = self.ready.popleft()
+                if result.generation == self.generation:
+                    return result
+                self.dropped_stale += 1
+            return None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {
+                "queued": len(self.jobs),
+                "in_flight": self.in_flight,
+                "ready": len(self.ready),
+                "completed": self.completed,
+                "dropped_full": self.dropped_full,
+                "dropped_stale": self.dropped_stale,
+                "mean_latency_ms": 1000 * self.total_latency / self.completed if self.completed else 0.0,
+            }
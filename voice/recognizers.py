@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import speech_recognition as sr
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+SAMPLE_RATE = 16000
+
+# Backends share one call: recognize(audio, language) takes an sr.AudioData and
+# returns the text, raising sr.UnknownValueError when nothing was understood and
+# sr.RequestError when the backend itself failed, like recognize_google does.
+
+
+class GoogleRecognizer:
+    name = "google"
+    uses_keywords = False
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def set_keywords(self, keywords):
+        pass
+
+    def recognize(self, audio, language):
+        return self.recognizer.recognize_google(audio, language=language)
+
+
+class VoskRecognizer:
+    # Offline recognition with a local Vosk model per language, looked up in
+    # $VOSK_MODEL_<LANG> or voice/models/<lang>. With keywords set, decoding is
+    # restricted to those phrases, which makes a small model both fast and
+    # accurate for command words; anything else comes back as "[unk]".
+    name = "vosk"
+    uses_keywords = True
+
+    def __init__(self, keywords=None, models_dir=MODELS_DIR):
+        if vosk is None:
+            raise RuntimeError("the vosk package is not installed (pip install vosk)")
+        vosk.SetLogLevel(-1)
+        self.models_dir = models_dir
+        self.models = {}
+        self.lock = threading.Lock()
+        self.grammar = None
+        self.set_keywords(keywords)
+
+    def set_keywords(self, keywords):
+        if keywords:
+            phrases = sorted({phrase.strip().lower() for phrase in keywords if phrase.strip()})
+            self.grammar = json.dumps(phrases + ["[unk]"], ensure_ascii=False)
+        else:
+            self.grammar = None
+
+    def model_path(self, language):
+        lang = language.split("-")[0].lower()
+        return os.environ.get(f"VOSK_MODEL_{lang.upper()}", os.path.join(self.models_dir, lang))
+
+    def model(self, language):
+        with self.lock:
+            if language not in self.models:
+                path = self.model_path(language)
+                if not os.path.isdir(path):
+                    raise sr.RequestError(f"no Vosk model for {language} at {path}")
+                self.models[language] = vosk.Model(path)
+            return self.models[language]
+
+    def recognize(self, audio, language):
+        model = self.model(language)
+        if self.grammar:
+            decoder = vosk.KaldiRecognizer(model, SAMPLE_RATE, self.grammar)
+        else:
+            decoder = vosk.KaldiRecognizer(model, SAMPLE_RATE)
+        decoder.AcceptWaveform(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2))
+        text = json.loads(decoder.FinalResult()).get("text", "")
+        text = " ".join(word for word in text.split() if word != "[unk]")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {"google": GoogleRecognizer, "vosk": VoskRecognizer}
+
+
+def make_recognizer(backend=None, keywords=None):
+    # The backend comes from $VOICE_BACKEND when not given; google stays the
+    # default. An offline backend that cannot start falls back to google.
+    backend = backend or os.environ.get("VOICE_BACKEND", "google")
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown recognizer backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == "google":
+        return GoogleRecognizer()
+    try:
+        return BACKENDS[backend](keywords=keywords)
+    except RuntimeError as e:
+        print(f"{backend} recognizer unavailable ({e}), using google")
+        return GoogleRecognizer()
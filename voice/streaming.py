@@ -0,0 +1,107 @@
+import json
+import queue
+import threading
+import time
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+
+class StreamEvent:
+    def __init__(self, kind, text, generation, started_at):
+        self.kind = kind
+        self.text = text
+        self.generation = generation
+        self.started_at = started_at
+
+
+class StreamingRecognizer:
+    # Feeds microphone audio to a Vosk decoder chunk by chunk and reports the
+    # partial hypothesis whenever it changes, then the final text when the
+    # decoder sees the end of the phrase. Events carry the generation they were
+    # heard in and the time the phrase started, like RecognitionPool results.
+    def __init__(self, backend, language, on_event=None):
+        if vosk is None or getattr(backend, "name", None) != "vosk":
+            raise RuntimeError("streaming recognition needs the vosk backend")
+        self.backend = backend
+        self.language = language
+        self.events = queue.Queue()
+        self.on_event = on_event
+        self.generation = 0
+        self.dropped_stale = 0
+        self.reset = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self, microphone):
+        # Same contract as Recognizer.listen_in_background: returns a stopper.
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.listen_loop, args=(microphone,), daemon=True)
+        self.thread.start()
+
+        def stop(wait_for_stop=True):
+            self.stop_event.set()
+            if wait_for_stop:
+                self.thread.join()
+        return stop
+
+    def new_generation(self):
+        # The decoder is reset on the listening thread so a half-heard answer to
+        # the previous puzzle cannot complete against the next one.
+        self.generation += 1
+        self.reset = True
+
+    def decoder(self, sample_rate):
+        model = self.backend.model(self.language)
+        if self.backend.grammar:
+            return vosk.KaldiRecognizer(model, sample_rate, self.backend.grammar)
+        return vosk.KaldiRecognizer(model, sample_rate)
+
+    def listen_loop(self, microphone):
+        with microphone as source:
+            decoder = self.decoder(source.SAMPLE_RATE)
+            grammar = self.backend.grammar
+            partial = ""
+            started_at = None
+            while not self.stop_event.is_set():
+                data = source.stream.read(source.CHUNK)
+                if self.reset:
+                    self.reset = False
+                    # The grammar may have changed with the puzzle.
+                    if self.backend.grammar != grammar:
+                        decoder = self.decoder(source.SAMPLE_RATE)
+                        grammar = self.backend.grammar
+                    else:
+                        decoder.Reset()
+                    partial, started_at = "", None
+                generation = self.generation
+                if decoder.AcceptWaveform(data):
+                    text = json.loads(decoder.Result()).get("text", "").replace("[unk]", "").strip()
+                    if text:
+                        self.emit(StreamEvent("final", text, generation, started_at or time.perf_counter()))
+                    partial, started_at = "", None
+                    continue
+                text = json.loads(decoder.PartialResult()).get("partial", "").replace("[unk]", "").strip()
+                if text and text != partial:
+                    if started_at is None:
+                        # Backdated by one chunk: the words began somewhere inside it.
+                        started_at = time.perf_counter() - source.CHUNK / source.SAMPLE_RATE
+                    partial = text
+                    self.emit(StreamEvent("partial", text, generation, started_at))
+
+    def emit(self, event):
+        self.events.put(event)
+        if self.on_event is not None:
+            self.on_event()
+
+    def poll(self):
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return None
+            if event.generation == self.generation:
+                return event
+            self.dropped_stale += 1